@@ -0,0 +1,140 @@
+"""
+Bounded LRU Cache
+==================
+Small thread-safe LRU cache with optional idle TTL, shared by every
+in-process cache in the app (session cache, extraction cache, ...).
+
+- ``maxsize`` bounds the entry count; the least recently used entry is
+  evicted first.
+- ``ttl`` (seconds) evicts entries that have not been touched for that
+  long. Expiry is checked lazily on access and by ``expire()``, which
+  walks from the least recently used end and stops at the first live
+  entry — so sweeping costs O(expired), not O(size).
+- ``on_evict(key, value)`` is called for capacity and TTL evictions
+  (not for explicit ``pop``), outside the internal lock.
+"""
+
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Hashable
+
+
+class LRUCache:
+    """Thread-safe LRU mapping with optional idle TTL and eviction hook."""
+
+    def __init__(self, maxsize: int, ttl: float | None = None,
+                 on_evict: Callable[[Hashable, Any], None] | None = None,
+                 touch_on_get: bool = True):
+        self.maxsize = max(1, int(maxsize))
+        self.ttl = ttl if ttl and ttl > 0 else None
+        self.on_evict = on_evict
+        self.touch_on_get = touch_on_get
+
+        # key -> [value, last_touched]; order = least → most recently used
+        self._data: OrderedDict = OrderedDict()
+        self._lock = Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            entry = self._data.get(key)
+            return entry is not None and not self._is_expired(entry, time.monotonic())
+
+    def _is_expired(self, entry: list, now: float) -> bool:
+        return self.ttl is not None and now - entry[1] > self.ttl
+
+    def _notify(self, evicted: list) -> None:
+        if self.on_evict is None:
+            return
+        for key, value in evicted:
+            self.on_evict(key, value)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value (refreshing recency) or ``default``."""
+        evicted = []
+        with self._lock:
+            entry = self._data.get(key)
+            now = time.monotonic()
+            if entry is None:
+                self.misses += 1
+                value = default
+            elif self._is_expired(entry, now):
+                del self._data[key]
+                self.evictions += 1
+                self.misses += 1
+                evicted.append((key, entry[0]))
+                value = default
+            else:
+                self.hits += 1
+                self._data.move_to_end(key)
+                if self.touch_on_get:
+                    entry[1] = now
+                value = entry[0]
+        self._notify(evicted)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Insert or replace ``key``, evicting LRU entries beyond maxsize."""
+        evicted = []
+        with self._lock:
+            now = time.monotonic()
+            if key in self._data:
+                self._data.move_to_end(key)
+            self._data[key] = [value, now]
+            while len(self._data) > self.maxsize:
+                old_key, old_entry = self._data.popitem(last=False)
+                self.evictions += 1
+                evicted.append((old_key, old_entry[0]))
+        self._notify(evicted)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove ``key`` without calling the eviction hook."""
+        with self._lock:
+            entry = self._data.pop(key, None)
+        return default if entry is None else entry[0]
+
+    def expire(self) -> int:
+        """Evict idle entries from the LRU end. Returns the count evicted."""
+        if self.ttl is None:
+            return 0
+        evicted = []
+        with self._lock:
+            now = time.monotonic()
+            while self._data:
+                key, entry = next(iter(self._data.items()))
+                # With touch_on_get=False recency and age can disagree,
+                # but stopping early only delays eviction to the next access.
+                if not self._is_expired(entry, now):
+                    break
+                del self._data[key]
+                self.evictions += 1
+                evicted.append((key, entry[0]))
+        self._notify(evicted)
+        return len(evicted)
+
+    def clear(self) -> None:
+        """Drop every entry without calling the eviction hook."""
+        with self._lock:
+            self._data.clear()
+
+    def items(self) -> list:
+        """Snapshot of (key, value) pairs, least recently used first."""
+        with self._lock:
+            return [(k, e[0]) for k, e in self._data.items()]
+
+    def stats(self) -> dict:
+        """Counters for metrics/logging."""
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
@@ -5,6 +5,8 @@ Loads environment variables from .env file for:
 - API_KEY: Authentication key for incoming requests
 - CEREBRAS_API_KEY: API key for Cerebras Cloud LLM service (fallback)
 - GROQ_API_KEY: API key for Groq Cloud LLM service (primary, optional)
+- SESSION_*: Session storage backend selection and locations
+- LLM_*: LLM client connection pooling and routing
 
 Uses a dual-LLM strategy: Groq (llama-3.3-70b) for high-quality agent
 replies, Cerebras (llama3.1-8b) as fallback for reliability.
@@ -29,3 +31,138 @@ if not CEREBRAS_API_KEY:
     raise RuntimeError("CEREBRAS_API_KEY not set in environment — check .env file")
 
 # GROQ_API_KEY is optional — system falls back to Cerebras if not set
+
+# ---------- SESSION STORAGE ----------
+# Backend for session state:
+#   file   — append-only local log (default, single process only)
+#   memory — in-process dict, nothing persisted (dev/testing)
+#   sqlite — SQLite in WAL mode, shareable by workers on one host
+#   redis  — any Redis-protocol server, shareable across hosts
+SESSION_BACKEND: str = os.getenv("SESSION_BACKEND", "file").strip().lower()
+SESSION_LOG_PATH: str = os.getenv("SESSION_LOG_PATH", "sessions.log")
+SESSION_SQLITE_PATH: str = os.getenv("SESSION_SQLITE_PATH", "sessions.db")
+SESSION_REDIS_URL: str = os.getenv("SESSION_REDIS_URL", "redis://localhost:6379/0")
+
+# Bounded in-process session cache: max sessions held in memory and idle
+# seconds before a session is evicted (reloaded lazily from the backend).
+SESSION_CACHE_MAX: int = int(os.getenv("SESSION_CACHE_MAX", "5000"))
+SESSION_IDLE_TTL: float = float(os.getenv("SESSION_IDLE_TTL", "1800"))
+
+# Write-behind session persistence: the flusher wakes every
+# SESSION_FLUSH_INTERVAL seconds and writes dirty sessions once the oldest
+# has waited SESSION_FLUSH_MAX_LATENCY seconds or SESSION_FLUSH_MAX_BATCH
+# are pending. SESSION_FLUSH_INTERVAL=0 disables it (write-through).
+SESSION_FLUSH_INTERVAL: float = float(os.getenv("SESSION_FLUSH_INTERVAL", "0.25"))
+SESSION_FLUSH_MAX_LATENCY: float = float(os.getenv("SESSION_FLUSH_MAX_LATENCY", "1.0"))
+SESSION_FLUSH_MAX_BATCH: int = int(os.getenv("SESSION_FLUSH_MAX_BATCH", "500"))
+
+# ---------- INTELLIGENCE EXTRACTION ----------
+# Number of most recent messages rescanned together each turn to catch
+# patterns that span message boundaries (replaces full-conversation scans).
+INTEL_SPAN_WINDOW: int = int(os.getenv("INTEL_SPAN_WINDOW", "3"))
+
+# ---------- LLM PROVIDERS ----------
+# Max pooled connections per provider for the async LLM client — bounds
+# how many provider calls run concurrently from one worker.
+LLM_MAX_CONNECTIONS: int = int(os.getenv("LLM_MAX_CONNECTIONS", "100"))
+
+# Hedged requests: if Groq has not answered within LLM_HEDGE_DELAY seconds,
+# race Cerebras against it and take the first valid reply. Set the delay
+# near Groq's p95 latency so only the slow tail is duplicated.
+LLM_HEDGE_ENABLED: bool = os.getenv("LLM_HEDGE_ENABLED", "false").strip().lower() in ("1", "true", "yes")
+LLM_HEDGE_DELAY: float = float(os.getenv("LLM_HEDGE_DELAY", "3.0"))
+
+# Stream agent replies and stop generation once the partial reply already
+# satisfies the guardrails (or passes the 600-char cap).
+LLM_STREAM_REPLIES: bool = os.getenv("LLM_STREAM_REPLIES", "true").strip().lower() in ("1", "true", "yes")
+
+# Per-provider circuit breaker: opens on 429 (for retry-after), 3 failures
+# in a row, or LLM_BREAKER_ERROR_RATE errors over the last
+# LLM_BREAKER_WINDOW calls; probes again after LLM_BREAKER_COOLDOWN seconds.
+# Providers averaging LLM_SLOW_LATENCY seconds or more are tried last.
+LLM_BREAKER_WINDOW: int = int(os.getenv("LLM_BREAKER_WINDOW", "20"))
+LLM_BREAKER_ERROR_RATE: float = float(os.getenv("LLM_BREAKER_ERROR_RATE", "0.5"))
+LLM_BREAKER_COOLDOWN: float = float(os.getenv("LLM_BREAKER_COOLDOWN", "30"))
+LLM_SLOW_LATENCY: float = float(os.getenv("LLM_SLOW_LATENCY", "10"))
+
+# Client-side quotas (requests / tokens per minute; 0 disables a limit).
+# Defaults are the free-tier limits. A call that would have to queue
+# longer than LLM_QUEUE_MAX_WAIT seconds is rerouted to the next provider.
+GROQ_RPM: int = int(os.getenv("GROQ_RPM", "30"))
+GROQ_TPM: int = int(os.getenv("GROQ_TPM", "12000"))
+CEREBRAS_RPM: int = int(os.getenv("CEREBRAS_RPM", "30"))
+CEREBRAS_TPM: int = int(os.getenv("CEREBRAS_TPM", "60000"))
+LLM_QUEUE_MAX_WAIT: float = float(os.getenv("LLM_QUEUE_MAX_WAIT", "2.0"))
+
+# ---------- AGENT PROMPT ----------
+# Token budget for conversation history in the agent prompt (newest
+# messages first), and the step the history start snaps to so the prompt
+# prefix stays identical across turns for provider-side prompt caching.
+PROMPT_HISTORY_TOKENS: int = int(os.getenv("PROMPT_HISTORY_TOKENS", "400"))
+PROMPT_HISTORY_STEP: int = int(os.getenv("PROMPT_HISTORY_STEP", "4"))
+# Token budget for the rolling summary of turns outside the history
+# budget (0 = drop them instead)
+PROMPT_SUMMARY_TOKENS: int = int(os.getenv("PROMPT_SUMMARY_TOKENS", "150"))
+
+# ---------- REPLY TEMPLATES ----------
+# LLM-free template replies (app/core/reply_templates.py):
+#   off      — never; stock fallback replies if every provider fails
+#   fallback — when no provider has capacity (circuits open / quota
+#              exhausted) or every provider fails
+#   always   — every turn (no LLM calls for replies at all)
+REPLY_TEMPLATE_MODE: str = os.getenv("REPLY_TEMPLATE_MODE", "fallback").strip().lower()
+
+# ---------- OVERLOAD CONTROL ----------
+# Staged load shedding (app/core/overload.py). Load is the larger of
+# in-flight requests / OVERLOAD_MAX_INFLIGHT and event-loop lag /
+# OVERLOAD_MAX_LAG (seconds); a raised stage is held for at least
+# OVERLOAD_HOLD_SECONDS.
+OVERLOAD_ENABLED: bool = os.getenv("OVERLOAD_ENABLED", "true").strip().lower() in ("1", "true", "yes")
+OVERLOAD_MAX_INFLIGHT: int = int(os.getenv("OVERLOAD_MAX_INFLIGHT", "64"))
+OVERLOAD_MAX_LAG: float = float(os.getenv("OVERLOAD_MAX_LAG", "0.25"))
+OVERLOAD_HOLD_SECONDS: float = float(os.getenv("OVERLOAD_HOLD_SECONDS", "5"))
+
+# ---------- CALLBACKS ----------
+# Dedicated callback delivery threads, and how many sessions may wait for
+# delivery before new sessions' callbacks are rejected (a session's queued
+# callback is replaced by its newer ones, never duplicated).
+CALLBACK_WORKERS: int = int(os.getenv("CALLBACK_WORKERS", "4"))
+CALLBACK_QUEUE_SIZE: int = int(os.getenv("CALLBACK_QUEUE_SIZE", "1000"))
+
+# Skip callbacks whose payload (ignoring engagement duration / message
+# count) matches the last one delivered for the session. With a debounce
+# > 0, such callbacks are instead held and sent once after that many
+# seconds without a newer turn, so the final counters still go out.
+CALLBACK_DEDUP: bool = os.getenv("CALLBACK_DEDUP", "true").strip().lower() in ("1", "true", "yes")
+CALLBACK_DEBOUNCE_SECONDS: float = float(os.getenv("CALLBACK_DEBOUNCE_SECONDS", "0"))
+
+# Per-callback delivery: request timeout and attempts, with full-jitter
+# exponential backoff between attempts (base * 2^n seconds, capped).
+CALLBACK_TIMEOUT: float = float(os.getenv("CALLBACK_TIMEOUT", "5"))
+CALLBACK_MAX_RETRIES: int = int(os.getenv("CALLBACK_MAX_RETRIES", "3"))
+CALLBACK_BACKOFF_BASE: float = float(os.getenv("CALLBACK_BACKOFF_BASE", "0.5"))
+CALLBACK_BACKOFF_MAX: float = float(os.getenv("CALLBACK_BACKOFF_MAX", "8"))
+
+# Durable outbox (SQLite) for callbacks that exhausted their retries —
+# replayed every CALLBACK_OUTBOX_INTERVAL seconds with backoff up to
+# CALLBACK_OUTBOX_MAX_DELAY, and across restarts, until delivered or older
+# than CALLBACK_OUTBOX_MAX_AGE. Empty path disables the outbox.
+CALLBACK_OUTBOX_PATH: str = os.getenv("CALLBACK_OUTBOX_PATH", "")
+CALLBACK_OUTBOX_INTERVAL: float = float(os.getenv("CALLBACK_OUTBOX_INTERVAL", "30"))
+CALLBACK_OUTBOX_MAX_DELAY: float = float(os.getenv("CALLBACK_OUTBOX_MAX_DELAY", "600"))
+CALLBACK_OUTBOX_MAX_AGE: float = float(os.getenv("CALLBACK_OUTBOX_MAX_AGE", "3600"))
+
+# ---------- ENGAGEMENT PACING ----------
+# Each session is kept on a schedule of PACING_TURN_SECONDS per turn (from
+# its startTime); a reply is held only for the part of that gap not already
+# spent processing. Disable to answer as fast as possible.
+PACING_ENABLED: bool = os.getenv("PACING_ENABLED", "true").strip().lower() in ("1", "true", "yes")
+PACING_TURN_SECONDS: float = float(os.getenv("PACING_TURN_SECONDS", "3.0"))
+
+# ---------- SCAM DETECTION ----------
+# Cache of LLM scam verdicts keyed by normalized conversation hash:
+# max entries, seconds a verdict stays valid, and an optional JSONL file
+# to persist verdicts across restarts (empty = memory only).
+VERDICT_CACHE_SIZE: int = int(os.getenv("VERDICT_CACHE_SIZE", "2048"))
+VERDICT_CACHE_TTL: float = float(os.getenv("VERDICT_CACHE_TTL", "86400"))
+VERDICT_CACHE_PATH: str = os.getenv("VERDICT_CACHE_PATH", "")
@@ -19,9 +19,19 @@ Key capabilities:
 - Payment-specific probing on turns 6 (UPI) and 7 (bank account + IFSC)
 - Bot-accusation deflection with rotating persona-consistent responses
 - Self-identifying word stripping to preserve character
+- Template replies (app.core.reply_templates) when no LLM provider has
+  capacity, when every provider fails, or always (REPLY_TEMPLATE_MODE)
 """
 
-from app.llm.llm_client import call_llm
+from app.llm.llm_client import call_llm, acall_llm, reply_available
+from app.llm.tokens import estimate_tokens, MESSAGE_OVERHEAD_TOKENS
+from app.core.phrase_matcher import PhraseMatcher
+from app.core.history_summary import update_summary, render_summary
+from app.core.reply_templates import template_reply
+from app.config import (
+    LLM_STREAM_REPLIES, PROMPT_HISTORY_TOKENS, PROMPT_HISTORY_STEP, PROMPT_SUMMARY_TOKENS,
+    REPLY_TEMPLATE_MODE,
+)
 import re
 import random
 import logging
@@ -135,7 +145,7 @@ Deflect warmly while extracting more from them:
 
 ===== CONVERSATION PACING =====
 
-You will receive a [Turn X/10 — ...] instruction before the conversation. Follow it carefully.
+You will receive a [Turn X/10 — ...] instruction after the conversation. Follow it carefully.
 Each turn must ask about a DIFFERENT piece of information.
 From turn 7 onward, stall gently: "My phone battery is low beta...", "Let me get my reading glasses...",
 "I need to call Rahul first, can you hold on?"  — but still ask for whatever the turn instruction says.
@@ -244,20 +254,200 @@ BOT_DEFENSE_RESPONSES = [
 ]
 
 
+# Payment terms required on turn 6 (UPI ask) and turn 7 (bank account ask)
+UPI_TERMS = ["upi", "gpay", "google pay", "phonepe", "paytm", "bhim"]
+BANK_TERMS = ["account number", "bank account", "ifsc", "bank transfer", "acc no", "account no"]
+
+# Reply length cap (concern + question + elicitation fit comfortably)
+MAX_REPLY_CHARS = 600
+
+# Where a streamed reply may stop: sentence-ending punctuation, optional
+# closing quotes/brackets, then whitespace or end of text. The preceding
+# word is captured so abbreviations and decimals ("Mr.", "Rs.", "1.")
+# aren't taken as sentence ends.
+_SENTENCE_END_REGEX = re.compile(r"(\w*)([.!?])['\")\]]*(?=\s|$)")
+_ABBREVIATIONS = {"mr", "mrs", "ms", "dr", "rs", "no", "st", "sr", "jr", "vs", "etc", "ref", "acc"}
+
+# Phrase-list matchers, built once (see phrase_matcher.py)
+_RED_FLAG_MATCHER = PhraseMatcher(RED_FLAG_INDICATORS)
+_ELICITATION_MATCHER = PhraseMatcher(ELICITATION_KEYWORDS)
+_SELF_IDENTIFYING_MATCHER = PhraseMatcher(SELF_IDENTIFYING_WORDS)
+_BOT_ACCUSATION_MATCHER = PhraseMatcher(BOT_ACCUSATION_PATTERNS)
+
+
+# ============================================================
+# PROMPT CONSTRUCTION (static parts built once at import)
+# ============================================================
+# Layout is ordered for provider-side prompt caching: the static system
+# prompt, then the conversation history (which only grows between turns),
+# then the per-turn context. Everything up to the newest messages is
+# therefore byte-identical to the previous turn's prompt.
+
+# Structured per-turn elicitation strategy:
+# Each turn targets a specific, distinct piece of intelligence.
+# Turns 6 and 7 are hardened to always ask for payment identifiers
+# (UPI ID and bank account + IFSC) since these are high-value intel.
+TURN_STRATEGY = {
+    1: "Build trust. Express concern. Ask their FULL NAME and which company/organisation they represent.",
+    2: "Sound confused but cooperative. Ask for their official EMPLOYEE ID, badge number, and department name.",
+    3: "Hesitate. Say you want to verify. Ask for the company's REGISTERED NAME, registration number, and OFFICIAL WEBSITE URL.",
+    4: "Say you need to call them back. Ask for their DIRECT CALLBACK PHONE NUMBER and extension.",
+    5: "Stall for time. Mention 'papers' or 'files'. Ask for the CASE ID, complaint REFERENCE NUMBER, and filing date.",
+    6: "Ask if there is a processing fee or verification charge. Say you prefer UPI. ASK EXPLICITLY: 'What is your UPI ID so I can send the amount?'",
+    7: "Say you will do a bank transfer instead. ASK EXPLICITLY: 'Can you give me your BANK ACCOUNT NUMBER and IFSC code for the transfer?'",
+    8: "Express more hesitation. Say you need to speak with a senior officer. Ask supervisor's FULL NAME, designation, and DIRECT PHONE NUMBER.",
+    9: "Request written proof. Say your son/daughter needs it in writing. Ask for their OFFICIAL EMAIL ADDRESS.",
+    10: "Wrap up with lingering suspicion. Ask WHEN they will send official written documentation or a legal notice.",
+}
+
+# (intel key, label, max values shown) for the [Captured: ...] line
+_CAPTURED_FIELDS = [
+    ("phoneNumbers", "phones", 3),
+    ("bankAccounts", "accounts", 3),
+    ("upiIds", "UPIs", 3),
+    ("emailAddresses", "emails", 3),
+    ("phishingLinks", "links", 2),
+    ("caseIds", "caseIDs", 2),
+    ("policyNumbers", "policies", 2),
+    ("orderNumbers", "orders", 2),
+]
+
+# (intel key, description) in probing priority order for [PRIORITY: ...]
+_MISSING_FIELDS = [
+    ("phoneNumbers", "phone number"),
+    ("bankAccounts", "bank account number"),
+    ("upiIds", "UPI ID"),
+    ("emailAddresses", "email address"),
+    ("phishingLinks", "website link or URL"),
+    ("caseIds", "case/reference ID"),
+    ("policyNumbers", "policy number"),
+    ("orderNumbers", "order/tracking ID"),
+]
+
+_SCORING_REMINDER = ("[REMEMBER: Include 1) concern about something suspicious "
+                     "2) question about their identity 3) request for specific data]")
+
+# Recent messages always included, however long they are
+PROMPT_MIN_MESSAGES = 2
+
+_SYSTEM_PROMPT_TOKENS = MESSAGE_OVERHEAD_TOKENS + estimate_tokens(AGENT_SYSTEM_PROMPT)
+
+
+# Reply used when the generation pipeline itself fails
+ERROR_REPLY = ("I want to make sure this is legitimate before proceeding — "
+               "this seems quite unusual. Can you share your employee ID "
+               "and a direct phone number I can call back on?")
+
+
 def _has_red_flag(text: str) -> bool:
     """Check if text contains recognizable red flag language."""
-    text_lower = text.lower()
-    return any(phrase in text_lower for phrase in RED_FLAG_INDICATORS)
+    return _RED_FLAG_MATCHER.contains_any(text.lower())
 
 
 def _has_elicitation(text: str) -> bool:
     """Check if text contains a data elicitation attempt."""
+    return _ELICITATION_MATCHER.contains_any(text.lower())
+
+
+def _has_payment_ask(text: str, turn_number: int) -> bool:
+    """Check the payment-turn requirement (turns 6 and 7 only)."""
+    if turn_number == 6:
+        terms = UPI_TERMS
+    elif turn_number == 7:
+        terms = BANK_TERMS
+    else:
+        return True
     text_lower = text.lower()
-    return any(kw in text_lower for kw in ELICITATION_KEYWORDS)
+    return any(t in text_lower for t in terms)
+
+
+def _complete_reply(partial: str, turn_number: int = 0) -> str | None:
+    """
+    Early-stop check for a streamed reply.
+
+    Args:
+        partial: Reply text received so far
+        turn_number: Current turn (for the payment-turn requirement)
+
+    Returns:
+        The text to keep once the reply is complete — the partial text if
+        it is past MAX_REPLY_CHARS (it would be cut anyway), or the text up
+        to its last full sentence if that already satisfies every guardrail
+        (red flag, question mark, elicitation, payment-turn ask). None to
+        keep streaming.
+    """
+    if len(partial) > MAX_REPLY_CHARS:
+        return partial
+
+    end = 0
+    for match in _SENTENCE_END_REGEX.finditer(partial):
+        word = match.group(1)
+        if match.group(2) == "." and (word.lower() in _ABBREVIATIONS or word.isdigit()):
+            continue
+        end = match.end()
+    if not end:
+        return None
+
+    reply = partial[:end]
+    if ("?" in reply
+            and _has_red_flag(reply)
+            and _has_elicitation(reply)
+            and _has_payment_ask(reply, turn_number)):
+        return reply
+    return None
+
+
+def _format_message(m: dict) -> str:
+    return f"{m.get('sender', 'unknown')}: {m.get('text', '')}"
 
 
-def _build_context_prompt(conversation_text: str, turn_number: int = 0,
-                          extracted_intel: dict = None) -> str:
+def _history_start(messages: list[dict]) -> int:
+    """
+    Index of the oldest message to include in the prompt.
+
+    Walks back from the newest message while the history fits within
+    PROMPT_HISTORY_TOKENS (always keeping PROMPT_MIN_MESSAGES), so only
+    the included tail is ever measured. The start is then snapped forward
+    to a multiple of PROMPT_HISTORY_STEP: it moves only every few
+    messages, keeping the history prefix byte-identical (and cacheable by
+    the provider) across consecutive turns.
+    """
+    start = len(messages)
+    used = 0
+    while start > 0:
+        cost = estimate_tokens(_format_message(messages[start - 1])) + 1
+        if used + cost > PROMPT_HISTORY_TOKENS and len(messages) - start >= PROMPT_MIN_MESSAGES:
+            break
+        used += cost
+        start -= 1
+
+    if start > 0 and PROMPT_HISTORY_STEP > 1:
+        snapped = -(-start // PROMPT_HISTORY_STEP) * PROMPT_HISTORY_STEP
+        start = min(snapped, len(messages) - PROMPT_MIN_MESSAGES)
+    return start
+
+
+def _format_history(messages: list[dict], summary_state: dict | None = None) -> str:
+    """
+    Render the budgeted tail of the conversation as 'sender: text' lines,
+    preceded by the rolling summary of the older turns when a summary
+    state is given (it is updated in place).
+    """
+    start = _history_start(messages)
+    lines = [_format_message(m) for m in messages[start:] if m.get("text")]
+    history = "\n".join(lines) or "No conversation yet."
+
+    if summary_state is not None and start > 0 and PROMPT_SUMMARY_TOKENS > 0:
+        update_summary(summary_state, messages, start)
+        summary = render_summary(summary_state)
+        if summary:
+            return f"{summary}\n\n{history}"
+    return history
+
+
+def _build_context_prompt(messages: list[dict], turn_number: int = 0,
+                          extracted_intel: dict = None,
+                          summary_state: dict | None = None) -> str:
     """
     Build a context-enriched prompt that tells the agent:
     - What turn of conversation this is (with pacing guidance)
@@ -265,95 +455,67 @@ def _build_context_prompt(conversation_text: str, turn_number: int = 0,
     - What intelligence is STILL MISSING (so it can probe for it)
     - Explicit reminders about scoring elements
 
-    Optimized for token efficiency — limits conversation context
-    to the most recent messages to save Groq API tokens while
-    still providing enough context for coherent replies.
+    The conversation comes first and the per-turn context last, so the
+    prompt prefix is stable across turns (see PROMPT CONSTRUCTION).
+    History is trimmed to PROMPT_HISTORY_TOKENS and older turns are
+    folded into a rolling summary of at most PROMPT_SUMMARY_TOKENS, so
+    prompt size — and the cost per turn — stays bounded however long the
+    conversation runs.
     """
-    parts = []
-
-    # Structured per-turn elicitation strategy:
-    # Each turn targets a specific, distinct piece of intelligence.
-    # Turns 6 and 7 are hardened to always ask for payment identifiers
-    # (UPI ID and bank account + IFSC) since these are high-value intel.
-    TURN_STRATEGY = {
-        1: "Build trust. Express concern. Ask their FULL NAME and which company/organisation they represent.",
-        2: "Sound confused but cooperative. Ask for their official EMPLOYEE ID, badge number, and department name.",
-        3: "Hesitate. Say you want to verify. Ask for the company's REGISTERED NAME, registration number, and OFFICIAL WEBSITE URL.",
-        4: "Say you need to call them back. Ask for their DIRECT CALLBACK PHONE NUMBER and extension.",
-        5: "Stall for time. Mention 'papers' or 'files'. Ask for the CASE ID, complaint REFERENCE NUMBER, and filing date.",
-        6: "Ask if there is a processing fee or verification charge. Say you prefer UPI. ASK EXPLICITLY: 'What is your UPI ID so I can send the amount?'",
-        7: "Say you will do a bank transfer instead. ASK EXPLICITLY: 'Can you give me your BANK ACCOUNT NUMBER and IFSC code for the transfer?'",
-        8: "Express more hesitation. Say you need to speak with a senior officer. Ask supervisor's FULL NAME, designation, and DIRECT PHONE NUMBER.",
-        9: "Request written proof. Say your son/daughter needs it in writing. Ask for their OFFICIAL EMAIL ADDRESS.",
-        10: "Wrap up with lingering suspicion. Ask WHEN they will send official written documentation or a legal notice.",
-    }
+    parts = [_format_history(messages, summary_state)]
 
     if turn_number > 0:
         strategy = TURN_STRATEGY.get(turn_number, TURN_STRATEGY[10])
         parts.append(f"[Turn {turn_number}/10 — {strategy}]")
 
-    # Show what we already have
     if extracted_intel:
-        captured = []
-        if extracted_intel.get("phoneNumbers"):
-            captured.append(f"phones: {', '.join(extracted_intel['phoneNumbers'][:3])}")
-        if extracted_intel.get("bankAccounts"):
-            captured.append(f"accounts: {', '.join(extracted_intel['bankAccounts'][:3])}")
-        if extracted_intel.get("upiIds"):
-            captured.append(f"UPIs: {', '.join(extracted_intel['upiIds'][:3])}")
-        if extracted_intel.get("emailAddresses"):
-            captured.append(f"emails: {', '.join(extracted_intel['emailAddresses'][:3])}")
-        if extracted_intel.get("phishingLinks"):
-            captured.append(f"links: {', '.join(extracted_intel['phishingLinks'][:2])}")
-        if extracted_intel.get("caseIds"):
-            captured.append(f"caseIDs: {', '.join(extracted_intel['caseIds'][:2])}")
-        if extracted_intel.get("policyNumbers"):
-            captured.append(f"policies: {', '.join(extracted_intel['policyNumbers'][:2])}")
-        if extracted_intel.get("orderNumbers"):
-            captured.append(f"orders: {', '.join(extracted_intel['orderNumbers'][:2])}")
-
+        # Show what we already have
+        captured = [
+            f"{label}: {', '.join(extracted_intel[key][:limit])}"
+            for key, label, limit in _CAPTURED_FIELDS
+            if extracted_intel.get(key)
+        ]
         if captured:
             parts.append(f"[Captured: {'; '.join(captured)}]")
 
         # Identify MISSING intelligence — key for targeted probing
-        missing = []
-        if not extracted_intel.get("phoneNumbers"):
-            missing.append("phone number")
-        if not extracted_intel.get("bankAccounts"):
-            missing.append("bank account number")
-        if not extracted_intel.get("upiIds"):
-            missing.append("UPI ID")
-        if not extracted_intel.get("emailAddresses"):
-            missing.append("email address")
-        if not extracted_intel.get("phishingLinks"):
-            missing.append("website link or URL")
-        if not extracted_intel.get("caseIds"):
-            missing.append("case/reference ID")
-        if not extracted_intel.get("policyNumbers"):
-            missing.append("policy number")
-        if not extracted_intel.get("orderNumbers"):
-            missing.append("order/tracking ID")
-
+        missing = [label for key, label in _MISSING_FIELDS if not extracted_intel.get(key)]
         if missing:
             # Prioritize top 3 most important missing items
             parts.append(f"[PRIORITY: Try to get their {', '.join(missing[:3])}]")
 
-    # Scoring reminder
-    parts.append("[REMEMBER: Include 1) concern about something suspicious 2) question about their identity 3) request for specific data]")
+    parts.append(_SCORING_REMINDER)
 
-    # Limit conversation text to last ~10 messages for token efficiency
-    # This saves API tokens without losing critical context
-    lines = conversation_text.split("\n")
-    if len(lines) > 10:
-        conversation_text = "\n".join(lines[-10:])
+    return "\n\n".join(parts)
 
-    parts.append(conversation_text)
 
-    return "\n\n".join(parts)
+def build_reply_messages(messages: list[dict], turn_number: int = 0,
+                         extracted_intel: dict = None,
+                         summary_state: dict | None = None) -> tuple[list[dict], int]:
+    """
+    Build the LLM chat messages for an agent reply.
+
+    Args:
+        messages: Conversation as a list of {'sender', 'text'} dicts
+        turn_number: Current turn (drives the per-turn strategy)
+        extracted_intel: Intelligence captured so far
+        summary_state: Session's rolling summary of older turns (updated
+                       in place); None to drop turns outside the budget
+
+    Returns:
+        (chat-completions messages, estimated prompt tokens)
+    """
+    prompt = _build_context_prompt(messages, turn_number, extracted_intel, summary_state)
+    llm_messages = [
+        {"role": "system", "content": AGENT_SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+    return llm_messages, _SYSTEM_PROMPT_TOKENS + MESSAGE_OVERHEAD_TOKENS + estimate_tokens(prompt)
 
 
-def generate_agent_reply(conversation_text: str, turn_number: int = 0,
-                         extracted_intel: dict = None) -> str:
+def generate_agent_reply(messages: list[dict], turn_number: int = 0,
+                         extracted_intel: dict = None,
+                         summary_state: dict | None = None) -> str:
     """
     Generate a context-aware agent reply with post-processing guardrails
     that GUARANTEE every response contains scoring elements.
@@ -367,163 +529,242 @@ def generate_agent_reply(conversation_text: str, turn_number: int = 0,
     6. Guardrail: ensure elicitation attempt present
     7. Length limits
 
+    Args:
+        messages: Conversation as a list of {'sender', 'text'} dicts
+        turn_number: Current turn number
+        extracted_intel: Intelligence captured so far
+        summary_state: Session's rolling summary of older turns
+
     Returns:
         Clean, in-character reply string with guaranteed scoring elements
     """
     try:
-        prompt = _build_context_prompt(conversation_text, turn_number,
-                                       extracted_intel)
+        llm_messages, early_reply = _prepare_reply(messages, turn_number,
+                                                   extracted_intel, summary_state)
+        if early_reply:
+            return early_reply
 
-        messages = [
-            {"role": "system", "content": AGENT_SYSTEM_PROMPT},
-            {"role": "user", "content": prompt}
-        ]
+        reply = call_llm(llm_messages, temperature=0.82,
+                         fallback=_template_fallback(messages, turn_number, extracted_intel))
+        return _finalize_reply(reply, turn_number)
 
-        # ============================================================
-        # EARLY BOT ACCUSATION CHECK
-        # Intercept before LLM call to save tokens and respond faster.
-        # If the scammer suspects automation, deflect immediately with
-        # a warm, persona-consistent human response.
-        # ============================================================
-        last_scammer_text = ""
-        for line in conversation_text.strip().split("\n")[-5:]:
-            if line.lower().startswith("scammer:"):
-                last_scammer_text = line.lower()
-
-        if any(p in last_scammer_text for p in BOT_ACCUSATION_PATTERNS):
-            defense = BOT_DEFENSE_RESPONSES[turn_number % len(BOT_DEFENSE_RESPONSES)]
-            logger.info("Bot accusation detected — using defense response")
-            return defense
-
-        reply = call_llm(messages, temperature=0.82)
-
-        # ============================================================
-        # PAYMENT-TURN VALIDATION (turns 6 and 7)
-        # Turn 6 must ask for a UPI ID. Turn 7 must ask for bank account
-        # + IFSC code. If the LLM omits the required payment terms,
-        # a targeted fallback suffix is appended before other guardrails.
-        # ============================================================
-        if turn_number == 6:
-            reply_lower_check = reply.lower()
-            upi_terms = ["upi", "gpay", "google pay", "phonepe", "paytm", "bhim"]
-            if not any(t in reply_lower_check for t in upi_terms):
-                reply = reply.rstrip() + " By the way, if there is any processing fee, can I send it by UPI? What is your UPI ID?"
-                logger.info("Payment guardrail turn 6: injected UPI ask")
-
-        if turn_number == 7:
-            reply_lower_check = reply.lower()
-            bank_terms = ["account number", "bank account", "ifsc", "bank transfer", "acc no", "account no"]
-            if not any(t in reply_lower_check for t in bank_terms):
-                reply = reply.rstrip() + " Actually, I prefer bank transfer. Could you please share your bank account number and IFSC code?"
-                logger.info("Payment guardrail turn 7: injected bank account ask")
-
-        # ============================================================
-        # POST-PROCESSING PIPELINE
-        # ============================================================
-
-        reply = reply.strip().replace("\n", " ")
-
-        # Remove any role prefixes the LLM might add
-        for prefix in [
-            "user:", "User:", "assistant:", "Assistant:",
-            "agent:", "Agent:", "honeypot:", "Honeypot:",
-            "customer:", "Customer:", "victim:", "Victim:",
-            "me:", "Me:", "reply:", "Reply:",
-            "response:", "Response:", "answer:", "Answer:",
-        ]:
-            if reply.lower().startswith(prefix.lower()):
-                reply = reply[len(prefix):].strip()
-
-        # Remove wrapping quotes
-        if reply.startswith('"') and reply.endswith('"'):
-            reply = reply[1:-1].strip()
-        if reply.startswith("'") and reply.endswith("'"):
-            reply = reply[1:-1].strip()
-
-        # Remove parenthetical notes the LLM might add
-        reply = re.sub(r'\s*\(Note:.*?\)\s*$', '', reply, flags=re.IGNORECASE).strip()
-        reply = re.sub(r'\s*\(.*?internal.*?\)\s*$', '', reply, flags=re.IGNORECASE).strip()
-        reply = re.sub(r'\s*\[.*?\]\s*$', '', reply).strip()
-
-        # Remove asterisk-based formatting
-        reply = re.sub(r'\*+', '', reply).strip()
-
-        # Strip any self-identifying words that would break persona
-        reply_lower = reply.lower()
-        for word in SELF_IDENTIFYING_WORDS:
-            if word in reply_lower:
-                reply = re.sub(re.escape(word), "confused person", reply, flags=re.IGNORECASE)
-                logger.warning(f"Guardrail: stripped self-identifying word '{word}'")
-
-        # ============================================================
-        # GUARDRAIL 1: Ensure RED FLAG observation
-        # If the response doesn't contain recognizable red flag language,
-        # prepend a natural-sounding concern. This GUARANTEES the evaluator
-        # counts it toward the 8-point Red Flag Identification score.
-        # ============================================================
-        if not _has_red_flag(reply):
-            flag = RED_FLAG_ADDITIONS[turn_number % len(RED_FLAG_ADDITIONS)]
-            reply = flag + reply
-            logger.info("Guardrail: added red flag observation")
-
-        # ============================================================
-        # GUARDRAIL 2: Ensure QUESTION MARK
-        # The evaluator counts questions asked (4 pts) and relevant
-        # questions (3 pts). A question mark is the minimum signal.
-        # ============================================================
-        if "?" not in reply:
-            fallback_questions = [
-                " Could you share your direct phone number so I can call back?",
-                " What is your official email address for correspondence?",
-                " Can you provide your employee ID or reference number?",
-                " Is there an official website where I can verify this?",
-                " What department or branch are you calling from?",
-                " Could you give me your supervisor's name and number?",
-                " What is the case reference number for this matter?",
-            ]
-            reply += fallback_questions[turn_number % len(fallback_questions)]
-            logger.info("Guardrail: added question")
-
-        # ============================================================
-        # GUARDRAIL 3: Ensure ELICITATION ATTEMPT
-        # If the response doesn't ask for specific data (phone, email,
-        # account, etc.), append an elicitation. Each attempt earns 1.5 pts
-        # toward the 7-point Information Elicitation score.
-        # ============================================================
-        if not _has_elicitation(reply):
-            elicit = ELICITATION_ADDITIONS[turn_number % len(ELICITATION_ADDITIONS)]
-            reply += elicit
-            logger.info("Guardrail: added elicitation attempt")
-
-        # ============================================================
-        # LENGTH LIMITS
-        # Keep response concise but comprehensive enough for all scoring
-        # elements. 600 chars allows for concern + question + elicitation.
-        # ============================================================
-        if len(reply) > 600:
-            # Try to cut at sentence boundary
-            sentences = re.split(r'(?<=[.!?])\s+', reply[:600])
-            if len(sentences) > 2:
-                # Keep at least 2 sentences + ensure question mark preserved
-                candidate = " ".join(sentences[:-1])
-                if "?" in candidate:
-                    reply = candidate
-                else:
-                    reply = " ".join(sentences)
-            else:
-                reply = reply[:600]
+    except Exception as e:
+        logger.error(f"Agent reply generation error: {e}")
+        return ERROR_REPLY
 
-        # Ensure reply is not empty after processing
-        if not reply or len(reply) < 10:
-            reply = ("That's concerning to hear — I've never been contacted "
-                     "this way before. Can you tell me which department "
-                     "you're calling from and share your direct phone number "
-                     "so I can verify this with the main office?")
 
-        return reply
+async def agenerate_agent_reply(messages: list[dict], turn_number: int = 0,
+                                extracted_intel: dict = None,
+                                summary_state: dict | None = None,
+                                template_only: bool = False) -> str:
+    """
+    Async version of generate_agent_reply() — awaits the LLM call so the
+    event loop keeps serving other sessions. Same pipeline and guardrails.
+
+    With LLM_STREAM_REPLIES the reply is streamed and generation stops as
+    soon as _complete_reply() accepts the partial text, instead of waiting
+    for the model to finish (and then trimming to 600 chars).
+
+    template_only serves a template reply without calling the LLM (set by
+    the overload controller when shedding load).
+
+    Returns:
+        Clean, in-character reply string with guaranteed scoring elements
+    """
+    try:
+        llm_messages, early_reply = _prepare_reply(messages, turn_number,
+                                                   extracted_intel, summary_state,
+                                                   template_only)
+        if early_reply:
+            return early_reply
+
+        stop_when = None
+        if LLM_STREAM_REPLIES:
+            stop_when = lambda partial: _complete_reply(partial, turn_number)
+        reply = await acall_llm(llm_messages, temperature=0.82, stop_when=stop_when,
+                                fallback=_template_fallback(messages, turn_number, extracted_intel))
+        return _finalize_reply(reply, turn_number)
 
     except Exception as e:
         logger.error(f"Agent reply generation error: {e}")
-        return ("I want to make sure this is legitimate before proceeding — "
-                "this seems quite unusual. Can you share your employee ID "
-                "and a direct phone number I can call back on?")
+        return ERROR_REPLY
+
+
+def _prepare_reply(messages: list[dict], turn_number: int, extracted_intel: dict | None,
+                   summary_state: dict | None = None,
+                   template_only: bool = False) -> tuple[list | None, str | None]:
+    """
+    Build the LLM messages for this turn, or a canned reply that skips
+    the LLM entirely.
+
+    Returns:
+        (messages, None) to call the LLM, or (None, reply) to answer directly
+    """
+    # ============================================================
+    # EARLY BOT ACCUSATION CHECK
+    # Intercept before LLM call to save tokens and respond faster.
+    # If the scammer suspects automation, deflect immediately with
+    # a warm, persona-consistent human response.
+    # ============================================================
+    last_scammer_text = ""
+    for m in messages[-5:]:
+        if str(m.get("sender", "")).lower() == "scammer":
+            last_scammer_text = m.get("text", "").lower()
+
+    if _BOT_ACCUSATION_MATCHER.contains_any(last_scammer_text):
+        defense = BOT_DEFENSE_RESPONSES[turn_number % len(BOT_DEFENSE_RESPONSES)]
+        logger.info("Bot accusation detected — using defense response")
+        return None, defense
+
+    # ============================================================
+    # TEMPLATE FAST PATH
+    # Serve a composed template reply without touching the LLM when
+    # configured to, or when no provider could take the call right now
+    # (all circuits open or quota exhausted).
+    # ============================================================
+    if REPLY_TEMPLATE_MODE == "always" or template_only:
+        reason = "always" if REPLY_TEMPLATE_MODE == "always" else "overload"
+        reply = template_reply(messages, turn_number, extracted_intel, reason=reason)
+        return None, _finalize_reply(reply, turn_number)
+
+    llm_messages, prompt_tokens = build_reply_messages(messages, turn_number,
+                                                       extracted_intel, summary_state)
+    logger.info(f"Agent prompt built — ~{prompt_tokens} tokens")
+
+    if REPLY_TEMPLATE_MODE == "fallback" and not reply_available(prompt_tokens):
+        logger.warning("No LLM provider has capacity — using template reply")
+        reply = template_reply(messages, turn_number, extracted_intel, reason="noCapacity")
+        return None, _finalize_reply(reply, turn_number)
+    return llm_messages, None
+
+
+def _template_fallback(messages: list[dict], turn_number: int, extracted_intel: dict | None):
+    """Reply source for when every LLM provider fails (None = stock FALLBACK_REPLIES)."""
+    if REPLY_TEMPLATE_MODE == "off":
+        return None
+    return lambda: template_reply(messages, turn_number, extracted_intel, reason="llmFailed")
+
+
+def _finalize_reply(reply: str, turn_number: int) -> str:
+    """
+    Clean the raw LLM reply and apply the guardrails (steps 3-7 of the
+    generate_agent_reply pipeline).
+    """
+    # ============================================================
+    # PAYMENT-TURN VALIDATION (turns 6 and 7)
+    # Turn 6 must ask for a UPI ID. Turn 7 must ask for bank account
+    # + IFSC code. If the LLM omits the required payment terms,
+    # a targeted fallback suffix is appended before other guardrails.
+    # ============================================================
+    if turn_number == 6:
+        if not _has_payment_ask(reply, turn_number):
+            reply = reply.rstrip() + " By the way, if there is any processing fee, can I send it by UPI? What is your UPI ID?"
+            logger.info("Payment guardrail turn 6: injected UPI ask")
+
+    if turn_number == 7:
+        if not _has_payment_ask(reply, turn_number):
+            reply = reply.rstrip() + " Actually, I prefer bank transfer. Could you please share your bank account number and IFSC code?"
+            logger.info("Payment guardrail turn 7: injected bank account ask")
+
+    # ============================================================
+    # POST-PROCESSING PIPELINE
+    # ============================================================
+
+    reply = reply.strip().replace("\n", " ")
+
+    # Remove any role prefixes the LLM might add
+    for prefix in [
+        "user:", "User:", "assistant:", "Assistant:",
+        "agent:", "Agent:", "honeypot:", "Honeypot:",
+        "customer:", "Customer:", "victim:", "Victim:",
+        "me:", "Me:", "reply:", "Reply:",
+        "response:", "Response:", "answer:", "Answer:",
+    ]:
+        if reply.lower().startswith(prefix.lower()):
+            reply = reply[len(prefix):].strip()
+
+    # Remove wrapping quotes
+    if reply.startswith('"') and reply.endswith('"'):
+        reply = reply[1:-1].strip()
+    if reply.startswith("'") and reply.endswith("'"):
+        reply = reply[1:-1].strip()
+
+    # Remove parenthetical notes the LLM might add
+    reply = re.sub(r'\s*\(Note:.*?\)\s*$', '', reply, flags=re.IGNORECASE).strip()
+    reply = re.sub(r'\s*\(.*?internal.*?\)\s*$', '', reply, flags=re.IGNORECASE).strip()
+    reply = re.sub(r'\s*\[.*?\]\s*$', '', reply).strip()
+
+    # Remove asterisk-based formatting
+    reply = re.sub(r'\*+', '', reply).strip()
+
+    # Strip any self-identifying words that would break persona
+    for word in _SELF_IDENTIFYING_MATCHER.find(reply.lower()):
+        reply = re.sub(re.escape(word), "confused person", reply, flags=re.IGNORECASE)
+        logger.warning(f"Guardrail: stripped self-identifying word '{word}'")
+
+    # ============================================================
+    # GUARDRAIL 1: Ensure RED FLAG observation
+    # If the response doesn't contain recognizable red flag language,
+    # prepend a natural-sounding concern. This GUARANTEES the evaluator
+    # counts it toward the 8-point Red Flag Identification score.
+    # ============================================================
+    if not _has_red_flag(reply):
+        flag = RED_FLAG_ADDITIONS[turn_number % len(RED_FLAG_ADDITIONS)]
+        reply = flag + reply
+        logger.info("Guardrail: added red flag observation")
+
+    # ============================================================
+    # GUARDRAIL 2: Ensure QUESTION MARK
+    # The evaluator counts questions asked (4 pts) and relevant
+    # questions (3 pts). A question mark is the minimum signal.
+    # ============================================================
+    if "?" not in reply:
+        fallback_questions = [
+            " Could you share your direct phone number so I can call back?",
+            " What is your official email address for correspondence?",
+            " Can you provide your employee ID or reference number?",
+            " Is there an official website where I can verify this?",
+            " What department or branch are you calling from?",
+            " Could you give me your supervisor's name and number?",
+            " What is the case reference number for this matter?",
+        ]
+        reply += fallback_questions[turn_number % len(fallback_questions)]
+        logger.info("Guardrail: added question")
+
+    # ============================================================
+    # GUARDRAIL 3: Ensure ELICITATION ATTEMPT
+    # If the response doesn't ask for specific data (phone, email,
+    # account, etc.), append an elicitation. Each attempt earns 1.5 pts
+    # toward the 7-point Information Elicitation score.
+    # ============================================================
+    if not _has_elicitation(reply):
+        elicit = ELICITATION_ADDITIONS[turn_number % len(ELICITATION_ADDITIONS)]
+        reply += elicit
+        logger.info("Guardrail: added elicitation attempt")
+
+    # ============================================================
+    # LENGTH LIMITS
+    # Keep response concise but comprehensive enough for all scoring
+    # elements. 600 chars allows for concern + question + elicitation.
+    # ============================================================
+    if len(reply) > MAX_REPLY_CHARS:
+        # Try to cut at sentence boundary
+        sentences = re.split(r'(?<=[.!?])\s+', reply[:MAX_REPLY_CHARS])
+        if len(sentences) > 2:
+            # Keep at least 2 sentences + ensure question mark preserved
+            candidate = " ".join(sentences[:-1])
+            if "?" in candidate:
+                reply = candidate
+            else:
+                reply = " ".join(sentences)
+        else:
+            reply = reply[:MAX_REPLY_CHARS]
+
+    # Ensure reply is not empty after processing
+    if not reply or len(reply) < 10:
+        reply = ("That's concerning to hear — I've never been contacted "
+                 "this way before. Can you tell me which department "
+                 "you're calling from and share your direct phone number "
+                 "so I can verify this with the main office?")
+
+    return reply
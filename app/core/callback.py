@@ -12,22 +12,122 @@ scam detection. Constructs comprehensive payloads including:
 
 The callback is sent on every request after scam detection to ensure
 the evaluator always has the latest and most complete intelligence.
-Implements retry logic with exponential backoff for reliability.
+Delivery reuses a pooled keep-alive HTTP session and retries with
+jittered exponential backoff. Callbacks that still fail can be kept in a
+durable SQLite outbox (CALLBACK_OUTBOX_PATH) and replayed later.
 
 Scoring targets addressed:
 - Response Structure (10 pts): All required + optional fields
 - Engagement Quality (10 pts): Real duration, message counts
 """
 
+import hashlib
+import json
 import requests
+import random
+import threading
 import time
 import logging
+from dataclasses import dataclass, field
+from requests.adapters import HTTPAdapter
+
+from app.config import (
+    CALLBACK_WORKERS, CALLBACK_TIMEOUT, CALLBACK_MAX_RETRIES,
+    CALLBACK_BACKOFF_BASE, CALLBACK_BACKOFF_MAX,
+    CALLBACK_OUTBOX_PATH, CALLBACK_OUTBOX_INTERVAL,
+    CALLBACK_OUTBOX_MAX_DELAY, CALLBACK_OUTBOX_MAX_AGE,
+)
+from app.core.callback_outbox import CallbackOutbox
 
 logger = logging.getLogger(__name__)
 
 GUVI_CALLBACK_URL = "https://hackathon.guvi.in/api/updateHoneyPotFinalResult"
 
 
+@dataclass(frozen=True, slots=True)
+class CallbackSnapshot:
+    """
+    The session fields a callback payload needs, captured at submit time.
+
+    Replaces a JSON round-trip of the whole session (including the full
+    message transcript) on every turn. get() mirrors dict.get so the
+    payload helpers accept a snapshot or a plain session dict.
+    """
+
+    intelligence: dict = field(default_factory=dict)
+    startTime: float = 0
+    totalMessages: int = 1
+    scamDetected: bool = True
+
+    @classmethod
+    def from_session(cls, session: dict) -> "CallbackSnapshot":
+        """Snapshot a live session (intel lists are copied, not shared)."""
+        intel = session.get("intelligence") or {}
+        return cls(
+            intelligence={k: list(v) if isinstance(v, list) else v for k, v in intel.items()},
+            startTime=session.get("startTime", 0),
+            totalMessages=session.get("totalMessages", 1),
+            scamDetected=session.get("scamDetected", True),
+        )
+
+    def get(self, key: str, default=None):
+        return getattr(self, key, default)
+
+    def fingerprint(self) -> str:
+        """
+        Digest of everything in the payload except the engagement counters.
+
+        formatted intel, scamType, confidenceLevel and agentNotes are all
+        derived from intelligence + scamDetected, so two snapshots with the
+        same fingerprint produce the same payload apart from duration and
+        message count (which grow every turn by construction).
+        """
+        content = json.dumps([self.intelligence, self.scamDetected], sort_keys=True, default=str)
+        return hashlib.blake2b(content.encode(), digest_size=16).hexdigest()
+
+
+# ====== HTTP Connection Pooling ======
+# One keep-alive session shared by the callback workers — a burst of
+# callbacks reuses a few TCP+TLS connections instead of a handshake each.
+
+_callback_session: requests.Session | None = None
+_callback_session_lock = threading.Lock()
+
+
+def _get_callback_session() -> requests.Session:
+    """Lazily initialize and return the pooled callback HTTP session."""
+    global _callback_session
+    if _callback_session is None:
+        with _callback_session_lock:
+            if _callback_session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_maxsize=max(CALLBACK_WORKERS, 1))
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers.update({"Content-Type": "application/json"})
+                _callback_session = session
+    return _callback_session
+
+
+def backoff_delay(attempt: int, base: float = CALLBACK_BACKOFF_BASE,
+                  cap: float = CALLBACK_BACKOFF_MAX) -> float:
+    """
+    Full-jitter exponential backoff: a random delay in
+    [0, min(cap, base * 2**attempt)], so retries from many workers spread
+    out instead of hitting the evaluator in lockstep.
+    """
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+# Durable outbox for callbacks whose retries all failed (disabled if no path)
+_outbox: CallbackOutbox | None = None
+if CALLBACK_OUTBOX_PATH:
+    try:
+        _outbox = CallbackOutbox(CALLBACK_OUTBOX_PATH, max_age=CALLBACK_OUTBOX_MAX_AGE)
+    except Exception as e:
+        logger.error(f"[CALLBACK OUTBOX] Disabled ({CALLBACK_OUTBOX_PATH}): {e}")
+
+
 def classify_scam_type(session_data: dict) -> str:
     """
     Classify the scam type based on keywords and intelligence extracted.
@@ -296,13 +396,9 @@ def build_agent_notes(session_data: dict) -> str:
     return header + "Scammer " + "; ".join(notes) + "."
 
 
-def send_final_callback(session_id: str, session_data: dict, callback_url: str = None) -> bool:
+def build_callback_payload(session_id: str, session_data: "CallbackSnapshot | dict") -> dict:
     """
-    Send intelligence report to GUVI evaluator endpoint.
-
-    Constructs the full payload with extracted intelligence, engagement
-    metrics, agent notes, scam type classification, and confidence level.
-    Implements retry with exponential backoff for reliability.
+    Build the evaluator payload for a session.
 
     Payload includes ALL fields from the Feb 19 scoring rubric:
     - sessionId (2 pts)
@@ -315,10 +411,10 @@ def send_final_callback(session_id: str, session_data: dict, callback_url: str =
 
     Args:
         session_id: Unique session identifier
-        session_data: Complete session dict with intelligence, timing, etc.
+        session_data: CallbackSnapshot (or session dict) with intelligence, timing, etc.
 
     Returns:
-        True if callback succeeded, False if all retries failed
+        JSON-serializable payload dict
     """
     intel = session_data.get("intelligence", {})
 
@@ -407,52 +503,164 @@ def send_final_callback(session_id: str, session_data: dict, callback_url: str =
         "confidenceLevel": confidence,                   # 1 pt
     }
 
-    # Use dynamic URL from request body if provided, else default
-    target_url = callback_url or GUVI_CALLBACK_URL
+    return payload
 
-    logger.info(f"[CALLBACK] Sending for session={session_id}")
-    logger.info(f"[CALLBACK] Intel: phones={len(formatted_phones)}, "
-                f"accounts={len(formatted_intel['bankAccounts'])}, "
-                f"upis={len(formatted_intel['upiIds'])}, "
-                f"links={len(formatted_intel['phishingLinks'])}, "
-                f"emails={len(formatted_intel['emailAddresses'])}, "
-                f"caseIds={len(formatted_intel['caseIds'])}, "
-                f"policyNums={len(formatted_intel['policyNumbers'])}, "
-                f"orderNums={len(formatted_intel['orderNumbers'])}")
-    logger.info(f"[CALLBACK] scamType={scam_type}, confidence={confidence}, "
-                f"duration={duration}s, msgs={total_msgs}")
-
-    MAX_RETRIES = 3
-
-    for attempt in range(MAX_RETRIES):
+
+def deliver_callback(session_id: str, payload: dict, target_url: str) -> bool:
+    """
+    POST a callback payload on the pooled session, retrying failures with
+    jittered exponential backoff (CALLBACK_MAX_RETRIES attempts).
+
+    Returns:
+        True if the evaluator accepted the callback
+    """
+    http = _get_callback_session()
+
+    for attempt in range(CALLBACK_MAX_RETRIES):
         try:
-            response = requests.post(
-                target_url,
-                json=payload,
-                headers={"Content-Type": "application/json"},
-                timeout=5
-            )
+            response = http.post(target_url, json=payload, timeout=CALLBACK_TIMEOUT)
 
             logger.info(f"[CALLBACK] Response status: {response.status_code}")
             response.raise_for_status()
 
-            session_data["callbackSent"] = True
             logger.info(f"[CALLBACK SUCCESS] session={session_id}")
-
             return True
 
         except requests.exceptions.Timeout:
-            logger.warning(f"[CALLBACK TIMEOUT] Attempt {attempt + 1}/{MAX_RETRIES}")
+            logger.warning(f"[CALLBACK TIMEOUT] Attempt {attempt + 1}/{CALLBACK_MAX_RETRIES}")
         except requests.exceptions.ConnectionError:
-            logger.warning(f"[CALLBACK CONN ERROR] Attempt {attempt + 1}/{MAX_RETRIES}")
+            logger.warning(f"[CALLBACK CONN ERROR] Attempt {attempt + 1}/{CALLBACK_MAX_RETRIES}")
         except requests.exceptions.HTTPError as e:
-            logger.warning(f"[CALLBACK HTTP ERROR] {e} — Attempt {attempt + 1}/{MAX_RETRIES}")
+            logger.warning(f"[CALLBACK HTTP ERROR] {e} — Attempt {attempt + 1}/{CALLBACK_MAX_RETRIES}")
         except Exception as e:
-            logger.error(f"[CALLBACK ERROR] {e} — Attempt {attempt + 1}/{MAX_RETRIES}")
+            logger.error(f"[CALLBACK ERROR] {e} — Attempt {attempt + 1}/{CALLBACK_MAX_RETRIES}")
 
-        # Quick retry — callback runs on background thread so no blocking
-        if attempt < MAX_RETRIES - 1:
-            time.sleep(0.5)
+        # Callback runs on a dispatcher worker thread, so sleeping is fine
+        if attempt < CALLBACK_MAX_RETRIES - 1:
+            time.sleep(backoff_delay(attempt))
 
     logger.error(f"[CALLBACK FAILED] All retries exhausted for session={session_id}")
     return False
+
+
+def send_final_callback(session_id: str, session_data: "CallbackSnapshot | dict",
+                        callback_url: str = None) -> bool:
+    """
+    Send intelligence report to GUVI evaluator endpoint.
+
+    Builds the full payload (see build_callback_payload) and delivers it
+    with retries. If every retry fails and the outbox is enabled, the
+    payload is kept there and replayed later — across restarts too.
+
+    Args:
+        session_id: Unique session identifier
+        session_data: CallbackSnapshot (or session dict) with intelligence, timing, etc.
+        callback_url: Override for the default GUVI callback URL
+
+    Returns:
+        True if callback succeeded, False if all retries failed
+    """
+    payload = build_callback_payload(session_id, session_data)
+    intel = payload["extractedIntelligence"]
+
+    # Use dynamic URL from request body if provided, else default
+    target_url = callback_url or GUVI_CALLBACK_URL
+
+    logger.info(f"[CALLBACK] Sending for session={session_id}")
+    logger.info(f"[CALLBACK] Intel: phones={len(intel['phoneNumbers'])}, "
+                f"accounts={len(intel['bankAccounts'])}, "
+                f"upis={len(intel['upiIds'])}, "
+                f"links={len(intel['phishingLinks'])}, "
+                f"emails={len(intel['emailAddresses'])}, "
+                f"caseIds={len(intel['caseIds'])}, "
+                f"policyNums={len(intel['policyNumbers'])}, "
+                f"orderNums={len(intel['orderNumbers'])}")
+    logger.info(f"[CALLBACK] scamType={payload['scamType']}, "
+                f"confidence={payload['confidenceLevel']}, "
+                f"duration={payload['engagementDurationSeconds']}s, "
+                f"msgs={payload['totalMessagesExchanged']}")
+
+    ok = deliver_callback(session_id, payload, target_url)
+
+    if _outbox is not None:
+        try:
+            if ok:
+                _outbox.remove(session_id)  # supersedes any older undelivered payload
+            else:
+                _outbox.save(session_id, target_url, payload,
+                             delay=backoff_delay(0, CALLBACK_OUTBOX_INTERVAL, CALLBACK_OUTBOX_MAX_DELAY))
+                logger.info(f"[CALLBACK OUTBOX] Stored for replay: session={session_id}")
+        except Exception as e:
+            logger.error(f"[CALLBACK OUTBOX ERROR] {e}")
+
+    return ok
+
+
+# ---------- DURABLE OUTBOX REPLAY ----------
+
+def replay_outbox_callback(session_id: str, _snapshot=None, callback_url: str = None) -> bool:
+    """
+    Deliver a session's outbox entry (dispatcher send function for replays).
+
+    Nothing is sent if the entry is gone — a newer callback for the
+    session was delivered meanwhile.
+    """
+    if _outbox is None:
+        return True
+    try:
+        entry = _outbox.get(session_id)
+        if entry is None:
+            return True
+        url, payload, attempts = entry
+
+        logger.info(f"[CALLBACK OUTBOX] Replaying session={session_id} (replay {attempts + 1})")
+        ok = deliver_callback(session_id, payload, url)
+        if ok:
+            _outbox.remove(session_id)
+        else:
+            _outbox.reschedule(session_id, backoff_delay(attempts + 1, CALLBACK_OUTBOX_INTERVAL,
+                                                         CALLBACK_OUTBOX_MAX_DELAY))
+        return ok
+    except Exception as e:
+        logger.error(f"[CALLBACK OUTBOX ERROR] {e}")
+        return False
+
+
+def start_outbox_replay(submit) -> None:
+    """
+    Start the background thread that hands due outbox entries to
+    ``submit(session_id)`` every CALLBACK_OUTBOX_INTERVAL seconds (first
+    pass immediately, so entries left by a previous process go out at
+    startup). No-op when the outbox is disabled.
+    """
+    if _outbox is None:
+        return
+
+    def _loop():
+        while True:
+            try:
+                for session_id in _outbox.due():
+                    submit(session_id)
+            except Exception as e:
+                logger.error(f"[CALLBACK OUTBOX ERROR] {e}")
+            time.sleep(CALLBACK_OUTBOX_INTERVAL)
+
+    threading.Thread(target=_loop, name="callback-outbox", daemon=True).start()
+    logger.info(f"[CALLBACK OUTBOX] Replay started ({_outbox.count()} pending, "
+                f"interval={CALLBACK_OUTBOX_INTERVAL}s)")
+
+
+def outbox_stats() -> dict:
+    """Outbox state for metrics."""
+    if _outbox is None:
+        return {"enabled": False}
+    try:
+        return {"enabled": True, "pending": _outbox.count()}
+    except Exception as e:
+        return {"enabled": True, "error": str(e)}
+
+
+def close_callback_outbox() -> None:
+    """Close the outbox database (called on app shutdown)."""
+    if _outbox is not None:
+        _outbox.close()
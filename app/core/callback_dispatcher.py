@@ -0,0 +1,253 @@
+"""
+Callback Dispatcher
+===================
+Dedicated, bounded delivery queue for GUVI callbacks.
+
+The endpoint sends a callback on every scam-detected turn. Handing each
+one to the default executor let bursts pile up there (each callback can
+retry for ~15s), delaying everything else that uses the pool. Instead:
+
+- Callbacks go to a bounded pending map keyed by session_id. A newer
+  snapshot for a session that is still waiting *replaces* the old one
+  (coalescing) — the evaluator only keeps the latest callback anyway.
+- A fixed pool of worker threads delivers them, oldest session first.
+  A session is never sent by two workers at once, so deliveries for one
+  session stay in order.
+- When the map is full, callbacks for new sessions are rejected (the
+  session's next turn submits again) and counted, instead of queueing
+  without bound.
+- Jobs may carry their own send function (outbox replays); a replay
+  never displaces a live snapshot that is already queued.
+- Deduplication: a job may carry a fingerprint of its payload content.
+  If it matches the last fingerprint delivered for the session the
+  callback is suppressed — or, with a ``debounce`` delay, held and sent
+  once as a trailing update after that many quiet seconds (each newer
+  submit restarts the wait). Changed payloads always go out immediately.
+
+stats() reports queue depth, in-flight sends, coalesced/dropped/
+suppressed counts and delivery outcomes for the /metrics endpoint.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable
+
+from app.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+
+class _Job:
+    """One queued callback."""
+
+    __slots__ = ("snapshot", "callback_url", "send", "fingerprint", "ready_at", "trailing")
+
+    def __init__(self, snapshot, callback_url, send, fingerprint, ready_at, trailing=False):
+        self.snapshot = snapshot
+        self.callback_url = callback_url
+        self.send = send
+        self.fingerprint = fingerprint
+        self.ready_at = ready_at
+        self.trailing = trailing  # held unchanged payload (debounce)
+
+
+class CallbackDispatcher:
+    """Bounded, per-session coalescing callback queue with its own workers."""
+
+    def __init__(self, send: Callable[..., bool], workers: int = 4, max_pending: int = 1000,
+                 debounce: float = 0.0, fingerprint_cache: int = 10000):
+        """
+        Args:
+            send: Delivery function ``send(session_id, snapshot, callback_url=...)``
+                  returning True on success
+            workers: Number of delivery threads
+            max_pending: Max sessions waiting for delivery
+            debounce: Seconds to hold an unchanged payload for one trailing
+                      send (0 = suppress unchanged payloads outright)
+            fingerprint_cache: Sessions whose last delivered fingerprint is kept
+        """
+        self._send = send
+        self.workers = max(1, workers)
+        self.max_pending = max(1, max_pending)
+        self.debounce = max(0.0, debounce)
+
+        self._cond = threading.Condition()
+        self._pending: OrderedDict = OrderedDict()  # session_id -> _Job
+        self._inflight: set = set()
+        self._delivered = LRUCache(fingerprint_cache)  # session_id -> fingerprint
+        self._threads: list[threading.Thread] = []
+        self._closed = False
+
+        self.submitted = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.suppressed = 0
+        self.debounced = 0
+        self.sent = 0
+        self.failed = 0
+        self.high_water = 0
+
+    def submit(self, session_id: str, snapshot, callback_url: str | None = None,
+               send: Callable[..., bool] | None = None, replace: bool = True,
+               fingerprint: str | None = None) -> bool:
+        """
+        Queue the latest callback for a session (non-blocking).
+
+        Args:
+            session_id: Session the callback belongs to
+            snapshot: Session snapshot passed to the send function
+            callback_url: Callback URL override
+            send: Send function for this job (default: the dispatcher's)
+            replace: Replace a callback already queued for the session;
+                     if False the queued one is kept and this is a no-op
+            fingerprint: Payload content fingerprint for deduplication
+                         (None = always send)
+
+        Returns:
+            False if the dispatcher is closed or the queue is full
+        """
+        with self._cond:
+            if self._closed:
+                return False
+            self.submitted += 1
+
+            now = time.monotonic()
+            unchanged = fingerprint is not None and fingerprint == self._delivered.get(session_id)
+            queued = self._pending.get(session_id)
+            if unchanged and queued is None and not self.debounce:
+                self.suppressed += 1
+                return True
+            ready_at = now + self.debounce if unchanged else now
+
+            if queued is not None:
+                # Keep only the newest snapshot; the session keeps its queue position
+                if replace:
+                    trailing = unchanged and queued.trailing
+                    if unchanged and not queued.trailing:
+                        ready_at = queued.ready_at  # a changed payload is already due
+                    self._pending[session_id] = _Job(snapshot, callback_url, send or self._send,
+                                                     fingerprint, ready_at, trailing=trailing)
+                self.coalesced += 1
+                self._cond.notify()
+                return True
+
+            if len(self._pending) >= self.max_pending:
+                self.dropped += 1
+                logger.warning(f"[CALLBACK QUEUE FULL] Dropped callback for session={session_id} "
+                               f"({len(self._pending)} pending)")
+                return False
+            self._pending[session_id] = _Job(snapshot, callback_url, send or self._send,
+                                             fingerprint, ready_at, trailing=unchanged)
+            if unchanged:
+                self.debounced += 1
+            self.high_water = max(self.high_water, len(self._pending))
+            if not self._threads:
+                self._start_workers()
+            self._cond.notify()
+            return True
+
+    def _start_workers(self) -> None:
+        """Spawn the worker threads (lock held; done lazily on first submit)."""
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"callback-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _next_job(self) -> tuple[tuple | None, float | None]:
+        """
+        Oldest due session not already being sent (lock held).
+
+        Returns:
+            ((session_id, job) or None, seconds until the next job is due
+            or None if nothing is waiting)
+        """
+        now = time.monotonic()
+        wait = None
+        for session_id, job in list(self._pending.items()):
+            if session_id in self._inflight:
+                continue
+            # On close, held trailing sends go out immediately
+            if job.ready_at > now and not self._closed:
+                delay = job.ready_at - now
+                wait = delay if wait is None else min(wait, delay)
+                continue
+
+            del self._pending[session_id]
+            if (not job.trailing and job.fingerprint is not None
+                    and job.fingerprint == self._delivered.get(session_id)):
+                # Same content was delivered while this job waited
+                if self.debounce and not self._closed:
+                    job.trailing = True
+                    job.ready_at = now + self.debounce
+                    self._pending[session_id] = job
+                    self.debounced += 1
+                    wait = self.debounce if wait is None else min(wait, self.debounce)
+                else:
+                    self.suppressed += 1
+                continue
+            self._inflight.add(session_id)
+            return (session_id, job), None
+        return None, wait
+
+    def _worker(self) -> None:
+        while True:
+            with self._cond:
+                job, wait = self._next_job()
+                while job is None:
+                    if self._closed and not self._pending:
+                        return
+                    self._cond.wait(timeout=wait)
+                    job, wait = self._next_job()
+            session_id, job = job
+
+            ok = False
+            try:
+                ok = job.send(session_id, job.snapshot, callback_url=job.callback_url)
+            except Exception as e:
+                logger.error(f"[CALLBACK BG ERROR] {e}")
+
+            with self._cond:
+                self._inflight.discard(session_id)
+                if ok:
+                    self.sent += 1
+                    if job.fingerprint is not None:
+                        self._delivered.set(session_id, job.fingerprint)
+                else:
+                    self.failed += 1
+                # A coalesced snapshot for this session may now be sendable
+                self._cond.notify_all()
+
+    def stats(self) -> dict:
+        """Queue and delivery counters for metrics/logging."""
+        with self._cond:
+            return {
+                "pending": len(self._pending),
+                "inflight": len(self._inflight),
+                "maxPending": self.max_pending,
+                "highWater": self.high_water,
+                "workers": self.workers,
+                "submitted": self.submitted,
+                "coalesced": self.coalesced,
+                "dropped": self.dropped,
+                "suppressed": self.suppressed,
+                "debounced": self.debounced,
+                "sent": self.sent,
+                "failed": self.failed,
+            }
+
+    def close(self, timeout: float = 10.0) -> None:
+        """
+        Stop accepting callbacks and give the workers up to ``timeout``
+        seconds to deliver what is still pending (called on app shutdown).
+        """
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            threads = list(self._threads)
+        for thread in threads:
+            thread.join(timeout=timeout / len(threads))
+        with self._cond:
+            if self._pending:
+                logger.warning(f"[CALLBACK] {len(self._pending)} callbacks undelivered at shutdown")
@@ -0,0 +1,107 @@
+"""
+Callback Outbox
+===============
+Durable retry queue for callbacks whose in-process retries all failed.
+
+One row per session in SQLite (WAL), holding the latest undelivered
+payload — a newer failure for the same session overwrites it, and any
+successful delivery for the session deletes it, so a replay can never
+send an older payload after a newer one got through. Rows survive
+restarts and are replayed with growing backoff until delivered or older
+than ``max_age`` (the evaluator stops listening long before then).
+"""
+
+import json
+import logging
+import sqlite3
+import time
+from threading import Lock
+
+logger = logging.getLogger(__name__)
+
+
+class CallbackOutbox:
+    """SQLite-backed store of undelivered callback payloads, one per session."""
+
+    def __init__(self, path: str, max_age: float = 3600.0):
+        self.path = path
+        self.max_age = max_age
+        self._lock = Lock()
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False,
+                                     isolation_level=None)  # autocommit
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")  # safe with WAL
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS callback_outbox ("
+            " session_id TEXT PRIMARY KEY,"
+            " url TEXT NOT NULL,"
+            " payload TEXT NOT NULL,"
+            " attempts INTEGER NOT NULL,"
+            " next_attempt REAL NOT NULL,"
+            " created REAL NOT NULL)"
+        )
+
+    _UPSERT = ("INSERT INTO callback_outbox (session_id, url, payload, attempts, next_attempt, created) "
+               "VALUES (?, ?, ?, 0, ?, ?) "
+               "ON CONFLICT(session_id) DO UPDATE SET url = excluded.url, "
+               "payload = excluded.payload, attempts = 0, "
+               "next_attempt = excluded.next_attempt, created = excluded.created")
+
+    def save(self, session_id: str, url: str, payload: dict, delay: float) -> None:
+        """Store (or replace) the session's undelivered payload."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(self._UPSERT, (session_id, url, json.dumps(payload), now + delay, now))
+
+    def get(self, session_id: str) -> tuple[str, dict, int] | None:
+        """(url, payload, replay attempts so far) or None if nothing is pending."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, payload, attempts FROM callback_outbox WHERE session_id = ?",
+                (session_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        try:
+            return row[0], json.loads(row[1]), row[2]
+        except json.JSONDecodeError:
+            logger.warning(f"Outbox entry for {session_id} corrupted — discarding")
+            self.remove(session_id)
+            return None
+
+    def remove(self, session_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM callback_outbox WHERE session_id = ?", (session_id,))
+
+    def reschedule(self, session_id: str, delay: float) -> None:
+        """Record a failed replay; try again after ``delay`` seconds."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE callback_outbox SET attempts = attempts + 1, next_attempt = ? "
+                "WHERE session_id = ?",
+                (time.time() + delay, session_id)
+            )
+
+    def due(self, limit: int = 100) -> list[str]:
+        """Sessions whose replay is due (expired entries are purged first)."""
+        now = time.time()
+        with self._lock:
+            expired = self._conn.execute(
+                "DELETE FROM callback_outbox WHERE created < ?", (now - self.max_age,)
+            ).rowcount
+            rows = self._conn.execute(
+                "SELECT session_id FROM callback_outbox WHERE next_attempt <= ? "
+                "ORDER BY next_attempt LIMIT ?",
+                (now, limit)
+            ).fetchall()
+        if expired:
+            logger.warning(f"[CALLBACK OUTBOX] Gave up on {expired} expired callbacks")
+        return [row[0] for row in rows]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM callback_outbox").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,97 @@
+"""
+Rolling History Summary
+=======================
+Compact, extractive summary of the conversation turns that no longer fit
+in the agent prompt's verbatim history (PROMPT_HISTORY_TOKENS).
+
+Without it, everything before the budgeted tail was simply dropped, so in
+long engagements the agent forgot what the scammer claimed early on. Each
+older message is folded into one short line — its first sentence, clipped
+to SUMMARY_LINE_CHARS — with no extra LLM call.
+
+- The summary state lives in the session (``session["historySummary"]``)
+  and is updated incrementally: only messages that left the verbatim
+  window since the last turn are folded, so per-turn cost stays constant.
+- It is bounded by PROMPT_SUMMARY_TOKENS; once full, the oldest lines are
+  dropped and counted, so prompt size stays predictable however long the
+  session runs.
+- The state records a digest of the last folded message. If the evaluator's
+  history no longer matches (e.g. a restarted conversation) the summary is
+  rebuilt from scratch.
+
+The state is a plain JSON-serializable dict so every session backend can
+persist it as-is.
+"""
+
+import hashlib
+import re
+
+from app.config import PROMPT_SUMMARY_TOKENS
+from app.llm.tokens import estimate_tokens
+
+# Longest summary line kept per folded message (characters)
+SUMMARY_LINE_CHARS = 100
+
+_FIRST_SENTENCE_REGEX = re.compile(r"^(.+?[.!?])(?:\s|$)", re.DOTALL)
+_SPACE_REGEX = re.compile(r"\s+")
+
+
+def _digest(message: dict) -> str:
+    text = f"{message.get('sender', '')}:{message.get('text', '')}"
+    return hashlib.blake2b(text.encode("utf-8", "replace"), digest_size=8).hexdigest()
+
+
+def summarize_message(message: dict) -> str:
+    """One 'sender: first sentence' line for a folded message."""
+    text = _SPACE_REGEX.sub(" ", message.get("text", "")).strip()
+    match = _FIRST_SENTENCE_REGEX.match(text)
+    if match:
+        text = match.group(1)
+    if len(text) > SUMMARY_LINE_CHARS:
+        text = text[:SUMMARY_LINE_CHARS - 1].rstrip() + "…"
+    return f"{message.get('sender', 'unknown')}: {text}"
+
+
+def update_summary(state: dict, messages: list[dict], upto: int) -> None:
+    """
+    Fold messages[:upto] into the rolling summary (in place).
+
+    Args:
+        state: Summary state from the session (an empty dict to start)
+        messages: Full conversation as {'sender', 'text'} dicts
+        upto: Index of the first message kept verbatim in the prompt
+    """
+    folded = state.get("upTo", 0)
+    if folded > upto or (folded and _digest(messages[folded - 1]) != state.get("anchor")):
+        state.clear()  # history changed under us — rebuild
+        folded = 0
+    if folded == upto:
+        return
+
+    lines = state.setdefault("lines", [])
+    tokens = state.get("tokens", 0)
+    omitted = state.get("omitted", 0)
+    for message in messages[folded:upto]:
+        if not message.get("text"):
+            continue
+        line = summarize_message(message)
+        lines.append(line)
+        tokens += estimate_tokens(line) + 1
+
+    while lines and tokens > PROMPT_SUMMARY_TOKENS:
+        tokens -= estimate_tokens(lines.pop(0)) + 1
+        omitted += 1
+
+    state.update(upTo=upto, anchor=_digest(messages[upto - 1]),
+                 tokens=tokens, omitted=omitted)
+
+
+def render_summary(state: dict) -> str:
+    """Prompt block for the summary ('' if nothing has been folded)."""
+    lines = state.get("lines")
+    if not lines:
+        return ""
+    header = "[Earlier in the conversation"
+    if state.get("omitted"):
+        header += f" ({state['omitted']} older messages not shown)"
+    return header + ":\n" + "\n".join(f"- {line}" for line in lines) + "]"
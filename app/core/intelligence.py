@@ -22,14 +22,29 @@ Categories extracted:
 - Policy numbers (POL-XXXX, POLICY/XXXX, etc.)
 - Order numbers (ORD-XXXX, ORDER#XXXX, etc.)
 
+Per-message results are cached by content hash (extract_intelligence_cached)
+so a message is extracted once no matter how often the history is resent.
+
 Scoring target: 30 pts (dynamic: 30 ÷ total fake fields in scenario)
 """
 
 import re
+import string
+import hashlib
 import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable
+
+from app.cache import LRUCache
+from app.core.phrase_matcher import PhraseMatcher
 
 logger = logging.getLogger(__name__)
 
+# Per-message extraction results keyed by content hash. Stores digests,
+# not message text, so memory per entry is just the (small) result dict.
+EXTRACTION_CACHE_SIZE = 4096
+_extraction_cache = LRUCache(EXTRACTION_CACHE_SIZE)
+
 
 # ==============================
 # REGEX PATTERNS
@@ -287,6 +302,9 @@ SUSPICIOUS_KEYWORDS = [
     "wallet", "deposit", "withdraw", "fee"
 ]
 
+# Built once; finds every keyword in a single pass (see phrase_matcher.py)
+_SUSPICIOUS_KEYWORD_MATCHER = PhraseMatcher(SUSPICIOUS_KEYWORDS)
+
 
 # ==============================
 # TEXT CLEANING
@@ -396,6 +414,223 @@ def _clean_id_match(match_text: str) -> str:
     return cleaned if len(cleaned) >= 3 else match_text.strip()
 
 
+# ==============================
+# SINGLE-PASS TRIGGER SCANNER
+# ==============================
+# Running ~20 regexes over the whole text costs ~20 full passes, and most
+# of them (IGNORECASE alternations) try a match at every position. Instead,
+# ONE scan over the lowercased text finds "trigger" positions — digit runs
+# and literal prefixes every match of a category must start with — and
+# each category regex is then only tried at its candidate positions.
+#
+# Results are identical to pattern.findall(text): findall returns the
+# leftmost match at or after the previous match end, and every position a
+# match can start at is in the candidate list, so trying candidates in
+# order finds exactly the same matches. Lookbehinds and \b still see the
+# full string because pattern.match(text, pos) does not slice.
+#
+# UPI/email and bare-domain matches start anywhere in a word, so their
+# triggers are the '@' / ".tld" that follows the word; the scan then walks
+# back over the word to produce the possible start positions.
+
+# Literal prefixes (lowercase) that every match of a category starts with.
+_CATEGORY_TRIGGERS = {
+    "phone": ["+"],
+    "whatsapp": ["whats", "wa"],
+    "labeledPhone": ["phone", "mobile", "cell", "contact", "call", "reach",
+                     "number", "dial", "helpline", "toll"],
+    "url": ["http", "www."],
+    "telegram": ["@", "t.me/", "telegram.me/"],
+    "amount": ["rs", "inr", "₹"],
+    "organization": [
+        "state bank of india", "sbi", "hdfc", "icici", "axis bank", "pnb",
+        "bank of", "canara bank", "union bank", "bob", "kotak", "yes bank",
+        "indusind", "rbl", "idbi", "indian bank", "uco bank", "central bank",
+        "reserve bank", "rbi", "sebi", "trai", "uidai", "income tax",
+        "it department", "cyber", "cbi", "ed", "enforcement directorate",
+        "paytm", "phonepe", "google", "gpay", "amazon", "flipkart", "jio",
+        "airtel", "vodafone", "bsnl", "anydesk", "teamviewer", "quick",
+        "microsoft", "apple", "netflix", "whatsapp", "telegram", "facebook",
+        "instagram",
+    ],
+    "remoteAccess": ["anydesk", "teamviewer", "quick", "ammyy", "ultraviewer",
+                     "airdroid", "remote"],
+    "caseId": ["case", "ref", "fir", "complaint", "ticket", "incident"],
+    "policy": ["polic", "insurance", "pol", "ins", "li"],
+    "order": ["order", "transaction", "track", "shipment", "ord", "txn",
+              "invoice"],
+    # Anchors that end a word; starts are found by walking back (see above)
+    "email": ["@"],
+    "bareDomain": [
+        "." + tld for tld in (
+            "com", "in", "org", "net", "co.in", "info", "xyz", "top", "click",
+            "link", "online", "site", "tech", "io", "app", "page", "live",
+            "me", "cc", "tk", "ml", "ga", "cf", "gq", "buzz", "club", "win",
+            "bid", "stream", "racing", "download", "review", "date",
+            "accountant", "science", "party", "cricket", "faith", "loan",
+            "trade", "webcam", "work",
+        )
+    ],
+}
+
+# Categories whose candidates include every digit-run start
+_DIGIT_RUN_CATEGORIES = ("phone", "tollFree", "bank", "card", "amount")
+
+# Characters the UPI/email local part and the bare-domain label can contain
+_EMAIL_LOCAL_CHARS = frozenset(string.ascii_letters + string.digits + "._%+-")
+_DOMAIN_LABEL_CHARS = frozenset(string.ascii_lowercase + string.digits + "-")
+
+
+def _build_literal_index(triggers: dict) -> dict:
+    """
+    Map trigger literal → categories, made prefix-free.
+
+    If one literal is a prefix of another, the longer one is dropped and
+    its categories move to the shorter one — any text starting with the
+    longer literal starts with the shorter one too. Prefix-freeness
+    guarantees at most one literal matches at any position.
+    """
+    index: dict[str, set] = {}
+    for category, literals in triggers.items():
+        for lit in literals:
+            index.setdefault(lit, set()).add(category)
+
+    for lit in sorted(index, key=len):
+        if lit not in index:
+            continue
+        for other in [o for o in index if o != lit and o.startswith(lit)]:
+            index[lit] |= index.pop(other)
+    return {lit: tuple(sorted(cats)) for lit, cats in index.items()}
+
+
+def _trie_pattern(literals) -> str:
+    """Prefix-factored alternation so the scan tries one branch per char."""
+    trie: dict = {}
+    for lit in literals:
+        node = trie
+        for ch in lit:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def emit(node: dict) -> str:
+        branches = [re.escape(ch) + emit(child) for ch, child in sorted(node.items()) if ch]
+        if "" in node:
+            return ""  # prefix-free: a terminal node has no children
+        return branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+
+    return emit(trie)
+
+
+_LITERAL_CATEGORIES = _build_literal_index(_CATEGORY_TRIGGERS)
+
+_TRIGGER_REGEX = re.compile(
+    r"(?P<digits>\d+)|(?P<literal>" + _trie_pattern(_LITERAL_CATEGORIES) + ")"
+)
+
+# Characters that IGNORECASE regexes treat as equal to an ASCII letter but
+# str.lower() leaves alone (long s ~ s, dotless i ~ i). Texts containing
+# them skip the scanner so results stay identical.
+_CASEFOLD_EXCEPTIONS = ("ſ", "ı")
+
+
+def _scan_triggers(text: str) -> dict | None:
+    """
+    One pass over ``text`` collecting candidate start positions per category.
+
+    Returns:
+        Dict of category → sorted candidate positions, or None when the
+        text cannot be scanned safely — callers then fall back to
+        full-text findall.
+    """
+    low = text.lower()
+    if len(low) != len(text):
+        return None
+    if not text.isascii() and any(ch in text for ch in _CASEFOLD_EXCEPTIONS):
+        return None
+
+    hits: dict[str, list] = {}
+    digit_starts = []
+    search = _TRIGGER_REGEX.search
+    pos = 0
+
+    while True:
+        m = search(low, pos)
+        if m is None:
+            break
+        start = m.start()
+        if m.lastgroup == "digits":
+            digit_starts.append(start)
+            pos = m.end()
+        else:
+            for category in _LITERAL_CATEGORIES[m.group()]:
+                hits.setdefault(category, []).append(start)
+            # A literal can hide another starting inside it ("inrs" → "rs")
+            pos = start + 1
+
+    if digit_starts:
+        for category in _DIGIT_RUN_CATEGORIES:
+            hits.setdefault(category, []).extend(digit_starts)
+
+        # IFSC: the mandatory '0' after 4 letters starts a digit run
+        hits["ifsc"] = [r - 4 for r in digit_starts if r >= 4]
+
+        # Generic IDs like "MS-2024-789": 2-5 letters + [-/] before a digit run
+        generic_ids = [
+            r - k for r in digit_starts if r >= 3 and text[r - 1] in "-/"
+            for k in range(3, min(r, 6) + 1)
+        ]
+        if generic_ids:
+            hits.setdefault("caseId", []).extend(generic_ids)
+
+        for category in ("phone", "amount", "caseId"):
+            if category in hits:
+                hits[category] = sorted(set(hits[category]))
+
+    if "email" in hits:
+        hits["email"] = _word_starts(text, hits["email"], _EMAIL_LOCAL_CHARS)
+    if "bareDomain" in hits:
+        # BARE_DOMAIN_REGEX is IGNORECASE, so walk the lowercased text
+        hits["bareDomain"] = _word_starts(low, hits["bareDomain"], _DOMAIN_LABEL_CHARS)
+
+    return hits
+
+
+def _word_starts(text: str, anchors: list, chars: frozenset) -> list:
+    """Every position from which a run of ``chars`` reaches an anchor."""
+    starts = set()
+    for i in anchors:
+        while i > 0 and text[i - 1] in chars:
+            i -= 1
+            starts.add(i)
+    return sorted(starts)
+
+
+def _findall(regex: re.Pattern, text: str, starts) -> list:
+    """
+    Equivalent of ``regex.findall(text)`` trying matches only at ``starts``.
+
+    ``starts=None`` means "no scanner info" and runs the plain findall.
+    """
+    if starts is None:
+        return regex.findall(text)
+
+    results = []
+    pos = 0
+    single_group = regex.groups == 1
+    match = regex.match
+    for start in starts:
+        if start < pos:
+            continue
+        m = match(text, start)
+        if m is not None:
+            results.append(m.group(1) if single_group else m.group())
+            pos = m.end() if m.end() > start else start + 1
+    return results
+
+
+_NON_DIGIT_REGEX = re.compile(r"\D")
+
+
 # ==============================
 # EXTRACTION ENGINE
 # ==============================
@@ -407,6 +642,8 @@ def extract_intelligence(text: str) -> dict:
     Runs multiple regex patterns to identify phone numbers, bank accounts,
     UPI IDs, emails, URLs, IFSC codes, Telegram handles, card numbers,
     monetary amounts, organizations mentioned, and suspicious keywords.
+    A single trigger scan first finds where each category can match, so
+    each regex is only tried at those positions (see _scan_triggers).
 
     Each extraction section is independently try/except wrapped so a
     failure in one category doesn't prevent extraction of others.
@@ -422,35 +659,53 @@ def extract_intelligence(text: str) -> dict:
     if not text:
         return empty_intel()
 
+    return _extract(text, _scan_triggers(text))
+
+
+def _extract(text: str, hits: dict | None) -> dict:
+    """
+    Run every category extractor over cleaned ``text``.
+
+    Args:
+        text: Cleaned, non-empty message text
+        hits: Candidate positions from _scan_triggers(), or None to run
+              each regex over the whole text
+
+    Returns:
+        Dictionary with categorized intelligence lists
+    """
+    def find(regex: re.Pattern, category: str) -> list:
+        return _findall(regex, text, None if hits is None else hits.get(category, ()))
+
     result = empty_intel()
 
     # ---------- PHONE NUMBERS ----------
     try:
-        raw_phones = PHONE_REGEX.findall(text)
+        raw_phones = find(PHONE_REGEX, "phone")
         phones = set()
         for p in raw_phones:
-            digits = re.sub(r"\D", "", p)
+            digits = _NON_DIGIT_REGEX.sub("", p)
             if len(digits) == 10:
                 phones.add(digits)
 
         # Also catch WhatsApp-specific numbers
-        wa_matches = WHATSAPP_REGEX.findall(text)
+        wa_matches = find(WHATSAPP_REGEX, "whatsapp")
         for p in wa_matches:
-            digits = re.sub(r"\D", "", p)
+            digits = _NON_DIGIT_REGEX.sub("", p)
             if len(digits) == 10:
                 phones.add(digits)
 
         # Also catch labeled phone number mentions
-        labeled_matches = LABELED_PHONE_REGEX.findall(text)
+        labeled_matches = find(LABELED_PHONE_REGEX, "labeledPhone")
         for p in labeled_matches:
-            digits = re.sub(r"\D", "", p)
+            digits = _NON_DIGIT_REGEX.sub("", p)
             if len(digits) == 10:
                 phones.add(digits)
 
         # Toll-free numbers (1800-XXX-XXXX)
-        tf_matches = TOLL_FREE_REGEX.findall(text)
+        tf_matches = find(TOLL_FREE_REGEX, "tollFree")
         for p in tf_matches:
-            digits = re.sub(r"\D", "", p)
+            digits = _NON_DIGIT_REGEX.sub("", p)
             if 10 <= len(digits) <= 11:
                 phones.add(digits)
 
@@ -460,7 +715,7 @@ def extract_intelligence(text: str) -> dict:
 
     # ---------- ALL @-ADDRESSES (UPI & Email) ----------
     try:
-        at_addresses = set(UPI_REGEX.findall(text))
+        at_addresses = set(find(UPI_REGEX, "email"))
         upis = set()
         emails = set()
 
@@ -473,7 +728,7 @@ def extract_intelligence(text: str) -> dict:
                 emails.add(addr_lower)
 
         # Catch emails that UPI regex might miss
-        for em in EMAIL_REGEX.findall(text):
+        for em in find(EMAIL_REGEX, "email"):
             em_lower = em.lower().rstrip(".")
             if is_email(em_lower) and em_lower not in upis:
                 emails.add(em_lower)
@@ -486,11 +741,11 @@ def extract_intelligence(text: str) -> dict:
     # ---------- BANK ACCOUNT NUMBERS ----------
     try:
         phones_set = set(result.get("phoneNumbers", []))
-        raw_numbers = BANK_REGEX.findall(text)
+        raw_numbers = find(BANK_REGEX, "bank")
         banks = set()
 
         for num in raw_numbers:
-            digits = re.sub(r"\D", "", num)
+            digits = _NON_DIGIT_REGEX.sub("", num)
 
             # Must be 9-18 digits (Indian accounts can be 9-18 digits)
             if len(digits) < 9 or len(digits) > 18:
@@ -533,13 +788,14 @@ def extract_intelligence(text: str) -> dict:
 
     # ---------- CARD NUMBERS ----------
     try:
-        card_matches = CARD_REGEX.findall(text)
+        card_matches = find(CARD_REGEX, "card")
         cards = set()
+        known_accounts = set(result.get("bankAccounts", []))
         for c in card_matches:
-            digits = re.sub(r"\D", "", c)
+            digits = _NON_DIGIT_REGEX.sub("", c)
             if 13 <= len(digits) <= 19:
                 # Don't add if already in bank accounts
-                if digits not in set(result.get("bankAccounts", [])):
+                if digits not in known_accounts:
                     cards.add(digits)
         if cards:
             # Add card numbers to bank accounts (evaluator scores them there)
@@ -551,12 +807,12 @@ def extract_intelligence(text: str) -> dict:
 
     # ---------- URLS ----------
     try:
-        urls = set(u.lower().rstrip(".,;:)") for u in URL_REGEX.findall(text))
+        urls = set(u.lower().rstrip(".,;:)") for u in find(URL_REGEX, "url"))
 
         # Also catch bare domain URLs — but skip if the full-URL version
         # (with http(s)://) is already captured, to avoid duplicates like
         # "https://sbi-verify.com/portal" AND "sbi-verify.com/portal"
-        bare_domains = BARE_DOMAIN_REGEX.findall(text)
+        bare_domains = find(BARE_DOMAIN_REGEX, "bareDomain")
         existing_stripped = {u.split("://", 1)[1] if "://" in u else u for u in urls}
         for d in bare_domains:
             d_clean = d.lower().rstrip(".,;:)")
@@ -564,7 +820,7 @@ def extract_intelligence(text: str) -> dict:
                 urls.add(d_clean)
 
         # APK / malware links
-        apks = set(u.lower().rstrip(".,;:)") for u in APK_REGEX.findall(text))
+        apks = set(u.lower().rstrip(".,;:)") for u in find(APK_REGEX, "url"))
         urls = urls | apks  # merge APK links into phishing links
 
         result["phishingLinks"] = sorted(urls)
@@ -574,14 +830,14 @@ def extract_intelligence(text: str) -> dict:
 
     # ---------- IFSC CODES ----------
     try:
-        ifscs = set(IFSC_REGEX.findall(text))
+        ifscs = set(find(IFSC_REGEX, "ifsc"))
         result["ifscCodes"] = sorted(ifscs)
     except Exception as e:
         logger.error(f"IFSC extraction error: {e}")
 
     # ---------- TELEGRAM ----------
     try:
-        raw_telegrams = TELEGRAM_REGEX.findall(text)
+        raw_telegrams = find(TELEGRAM_REGEX, "telegram")
         telegrams = set()
         # Collect UPI/email domains to filter Telegram false positives
         upi_email_domains = set()
@@ -603,7 +859,7 @@ def extract_intelligence(text: str) -> dict:
 
     # ---------- MONETARY AMOUNTS ----------
     try:
-        amounts = AMOUNT_REGEX.findall(text)
+        amounts = find(AMOUNT_REGEX, "amount")
         cleaned_amounts = set()
         for a in amounts:
             a_clean = a.strip().rstrip(",.:;")
@@ -616,7 +872,7 @@ def extract_intelligence(text: str) -> dict:
 
     # ---------- ORGANIZATIONS MENTIONED ----------
     try:
-        orgs = ORGANIZATION_REGEX.findall(text)
+        orgs = find(ORGANIZATION_REGEX, "organization")
         result["organizationsMentioned"] = sorted(
             set(o.strip() for o in orgs if o.strip())
         )
@@ -625,7 +881,7 @@ def extract_intelligence(text: str) -> dict:
 
     # ---------- REMOTE ACCESS TOOLS ----------
     try:
-        remote_tools = REMOTE_ACCESS_REGEX.findall(text)
+        remote_tools = find(REMOTE_ACCESS_REGEX, "remoteAccess")
         if remote_tools:
             result["remoteAccessTools"] = sorted(
                 set(r.lower().strip() for r in remote_tools)
@@ -635,7 +891,7 @@ def extract_intelligence(text: str) -> dict:
 
     # ---------- CASE / REFERENCE IDS ----------
     try:
-        case_matches = CASE_ID_REGEX.findall(text)
+        case_matches = find(CASE_ID_REGEX, "caseId")
         if case_matches:
             case_ids = set()
             for c in case_matches:
@@ -649,7 +905,7 @@ def extract_intelligence(text: str) -> dict:
 
     # ---------- POLICY NUMBERS ----------
     try:
-        policy_matches = POLICY_NUMBER_REGEX.findall(text)
+        policy_matches = find(POLICY_NUMBER_REGEX, "policy")
         if policy_matches:
             policy_nums = set()
             for p in policy_matches:
@@ -663,7 +919,7 @@ def extract_intelligence(text: str) -> dict:
 
     # ---------- ORDER NUMBERS ----------
     try:
-        order_matches = ORDER_NUMBER_REGEX.findall(text)
+        order_matches = find(ORDER_NUMBER_REGEX, "order")
         if order_matches:
             order_nums = set()
             for o in order_matches:
@@ -677,11 +933,7 @@ def extract_intelligence(text: str) -> dict:
 
     # ---------- SUSPICIOUS KEYWORDS ----------
     try:
-        lowered = text.lower()
-        keywords = set()
-        for kw in SUSPICIOUS_KEYWORDS:
-            if kw in lowered:
-                keywords.add(kw)
+        keywords = _SUSPICIOUS_KEYWORD_MATCHER.find(text.lower())
         result["suspiciousKeywords"] = sorted(keywords)
     except Exception as e:
         logger.error(f"Keyword extraction error: {e}")
@@ -689,6 +941,90 @@ def extract_intelligence(text: str) -> dict:
     return result
 
 
+def _content_key(text: str) -> str:
+    """Stable 128-bit digest of a message text, used as the cache key."""
+    return hashlib.blake2b(text.encode("utf-8", "replace"), digest_size=16).hexdigest()
+
+
+def extract_intelligence_cached(text: str) -> dict:
+    """
+    Content-hash cached wrapper around extract_intelligence().
+
+    Scam campaigns resend identical messages and the evaluator resends
+    the full history every turn, so most messages are extracted once.
+
+    Args:
+        text: A single message text to analyze
+
+    Returns:
+        Dictionary with categorized intelligence lists (a fresh copy
+        the caller may mutate)
+    """
+    key = _content_key(text or "")
+    cached = _extraction_cache.get(key)
+    if cached is None:
+        cached = extract_intelligence(text)
+        _extraction_cache.set(key, cached)
+    return {k: list(v) for k, v in cached.items()}
+
+
+def _extract_batch(texts: list) -> list:
+    """Extract a list of texts in one call (process-pool work unit)."""
+    empty = None
+    results = []
+    for text in texts:
+        text = clean_scammer_text(text)
+        if text:
+            results.append(_extract(text, _scan_triggers(text)))
+        else:
+            if empty is None:
+                empty = empty_intel()
+            results.append(empty)
+    return results
+
+
+def extract_intelligence_many(texts: Iterable[str], workers: int = 0,
+                              chunksize: int = 500) -> tuple[list, dict]:
+    """
+    Batch extraction for offline reprocessing of many message texts.
+
+    Identical texts are extracted once, and the aggregate is built from
+    per-category sets sorted once at the end instead of repeated
+    merge_intelligence() calls. Bypasses the live extraction cache so a
+    large batch does not evict the hot conversation entries.
+
+    Args:
+        texts: Message texts to analyze
+        workers: Process-pool size; 0 or 1 extracts in this process
+        chunksize: Distinct texts sent to a worker per task
+
+    Returns:
+        Tuple of (per-text results in input order, merged aggregate).
+        Duplicate and empty texts share one result dict — treat the
+        results as read-only.
+    """
+    texts = [text or "" for text in texts]
+    distinct = list(dict.fromkeys(texts))
+
+    if workers > 1 and len(distinct) > chunksize:
+        chunks = [distinct[i:i + chunksize] for i in range(0, len(distinct), chunksize)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            extracted = [r for batch in pool.map(_extract_batch, chunks) for r in batch]
+    else:
+        extracted = _extract_batch(distinct)
+
+    by_text = dict(zip(distinct, extracted))
+    results = [by_text[text] for text in texts]
+
+    aggregate = {key: set() for key in empty_intel()}
+    for result in extracted:
+        for key, values in result.items():
+            if values:
+                aggregate.setdefault(key, set()).update(values)
+
+    return results, {key: sorted(values) for key, values in aggregate.items()}
+
+
 def merge_intelligence(existing: dict, new_intel: dict) -> dict:
     """
     Merge newly extracted intelligence into existing intelligence dict.
@@ -0,0 +1,200 @@
+"""
+Overload Controller
+===================
+Admission-side load shedding for the honeypot endpoint.
+
+Every request used to get the full pipeline — LLM scam detection, LLM
+reply and the cross-message re-extraction — however busy the service
+was, so a spike saturated provider quotas and the event loop and every
+session's latency went up together. The controller watches three
+signals:
+
+- in-flight requests (counted while a request is doing real work, not
+  while it sits in its pacing delay), relative to OVERLOAD_MAX_INFLIGHT;
+- event-loop lag, sampled by a background task as the overshoot of a
+  short sleep (smoothed), relative to OVERLOAD_MAX_LAG;
+- reply-provider health: when no provider has an open circuit and
+  quota left, load is raised to the template-reply stage.
+
+and degrades step by step as the load ratio rises:
+
+    stage 1 (≥ 50%)  skip the LLM scam detection (keyword/intel fallbacks only)
+    stage 2 (≥ 75%)  serve template replies instead of calling the LLM
+                     (unless REPLY_TEMPLATE_MODE=off)
+    stage 3 (≥ 100%) also skip the cross-message window re-extraction
+
+Each request calls admit() on arrival, which counts it in flight and
+returns its Admission carrying the stage decision. A raised stage is held
+for at least OVERLOAD_HOLD_SECONDS so the service doesn't flap between
+stages at the threshold. stats() reports the
+current stage, the signals, and how many requests each degradation was
+applied to, for the /metrics endpoint.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from threading import Lock
+
+from app.config import REPLY_TEMPLATE_MODE
+from app.llm.llm_client import reply_available
+
+logger = logging.getLogger(__name__)
+
+# Load ratio at which each stage starts (index = stage - 1)
+STAGE_THRESHOLDS = (0.5, 0.75, 1.0)
+
+# Event-loop lag sampling period (seconds) and smoothing factor
+LAG_SAMPLE_INTERVAL = 0.5
+LAG_SMOOTHING = 0.3
+
+# Prompt size assumed for the provider-capacity check
+_TYPICAL_PROMPT_TOKENS = 1500
+
+
+@dataclass(frozen=True, slots=True)
+class Degradation:
+    """Which parts of the pipeline a request should skip."""
+
+    stage: int = 0
+    skip_llm_detection: bool = False
+    template_replies: bool = False
+    skip_window_extraction: bool = False
+
+
+_FULL_SERVICE = Degradation()
+
+
+class Admission:
+    """An admitted request: its degradation and its in-flight slot."""
+
+    __slots__ = ("degradation", "_controller", "_released")
+
+    def __init__(self, controller: "OverloadController", degradation: Degradation):
+        self.degradation = degradation
+        self._controller = controller
+        self._released = False
+
+    def release(self) -> None:
+        """Stop counting the request as in flight (idempotent)."""
+        if not self._released:
+            self._released = True
+            self._controller._release()
+
+
+class OverloadController:
+    """Tracks load signals and decides each request's degradation stage."""
+
+    def __init__(self, max_inflight: int = 64, max_lag: float = 0.25,
+                 hold: float = 5.0, enabled: bool = True):
+        self.max_inflight = max(1, max_inflight)
+        self.max_lag = max(0.001, max_lag)
+        self.hold = hold
+        self.enabled = enabled
+
+        self._lock = Lock()
+        self._inflight = 0
+        self._lag = 0.0
+        self._stage = 0
+        self._stage_until = 0.0
+        self._monitor: asyncio.Task | None = None
+
+        self.peak_inflight = 0
+        self.applied = {"skipLlmDetection": 0, "templateReplies": 0, "skipWindowExtraction": 0}
+        self.by_stage = [0, 0, 0, 0]
+
+    # ---------- signals ----------
+
+    def admit(self) -> Admission:
+        """
+        Count a request as in flight and decide its degradation stage.
+        The caller must release() the admission once its real work is done.
+        """
+        with self._lock:
+            self._inflight += 1
+            self.peak_inflight = max(self.peak_inflight, self._inflight)
+        return Admission(self, self._decide())
+
+    def _release(self) -> None:
+        with self._lock:
+            self._inflight -= 1
+
+    async def _sample_lag(self) -> None:
+        while True:
+            start = time.monotonic()
+            await asyncio.sleep(LAG_SAMPLE_INTERVAL)
+            lag = max(0.0, time.monotonic() - start - LAG_SAMPLE_INTERVAL)
+            with self._lock:
+                self._lag += LAG_SMOOTHING * (lag - self._lag)
+
+    def start(self) -> None:
+        """Start the event-loop lag sampler (call from the running loop)."""
+        if self.enabled and self._monitor is None:
+            self._monitor = asyncio.get_running_loop().create_task(self._sample_lag())
+
+    async def stop(self) -> None:
+        if self._monitor is not None:
+            self._monitor.cancel()
+            try:
+                await self._monitor
+            except asyncio.CancelledError:
+                pass
+            self._monitor = None
+
+    # ---------- decisions ----------
+
+    def _load(self) -> float:
+        """Load ratio from the current signals (lock held)."""
+        load = max(self._inflight / self.max_inflight, self._lag / self.max_lag)
+        if load < STAGE_THRESHOLDS[1] and not reply_available(_TYPICAL_PROMPT_TOKENS):
+            load = STAGE_THRESHOLDS[1]  # no provider can take a reply call
+        return load
+
+    def _decide(self) -> Degradation:
+        """Degradation stage for a request arriving now."""
+        if not self.enabled:
+            return _FULL_SERVICE
+        now = time.monotonic()
+        with self._lock:
+            load = self._load()
+            stage = sum(load >= threshold for threshold in STAGE_THRESHOLDS)
+            if stage >= self._stage:
+                if stage > self._stage:
+                    logger.warning(f"[OVERLOAD] Stage {self._stage} → {stage} "
+                                   f"(inflight={self._inflight}, lag={self._lag * 1000:.0f}ms)")
+                self._stage = stage
+                self._stage_until = now + self.hold
+            elif now >= self._stage_until:
+                logger.info(f"[OVERLOAD] Stage {self._stage} → {stage}")
+                self._stage = stage
+                self._stage_until = now + self.hold
+            stage = self._stage
+
+            degradation = Degradation(
+                stage=stage,
+                skip_llm_detection=stage >= 1,
+                template_replies=stage >= 2 and REPLY_TEMPLATE_MODE != "off",
+                skip_window_extraction=stage >= 3,
+            )
+            self.by_stage[stage] += 1
+            self.applied["skipLlmDetection"] += degradation.skip_llm_detection
+            self.applied["templateReplies"] += degradation.template_replies
+            self.applied["skipWindowExtraction"] += degradation.skip_window_extraction
+        return degradation
+
+    def stats(self) -> dict:
+        """Current stage, load signals and per-degradation counters."""
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "stage": self._stage,
+                "inflight": self._inflight,
+                "peakInflight": self.peak_inflight,
+                "maxInflight": self.max_inflight,
+                "loopLagMs": round(self._lag * 1000, 1),
+                "maxLagMs": round(self.max_lag * 1000, 1),
+                "requestsByStage": list(self.by_stage),
+                "applied": dict(self.applied),
+            }
+
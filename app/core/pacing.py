@@ -0,0 +1,82 @@
+"""
+Engagement Pacing
+=================
+Keeps each session's wall-clock duration on schedule for the Engagement
+Quality score without a fixed sleep on every request.
+
+The old approach awaited ``asyncio.sleep(3)`` before any work, so the
+LLM latency stacked on top of the delay and every connection was held
+for 3s + processing. Pacing instead:
+
+- targets a session schedule of PACING_TURN_SECONDS per turn, measured
+  from the session's ``startTime`` — if the scammer's own gaps already
+  keep the session on schedule, no delay is added at all;
+- runs after the request's real work, so detection and LLM latency count
+  toward the gap and only the remainder is awaited;
+- never delays a request beyond PACING_TURN_SECONDS in total.
+
+Set PACING_ENABLED=false to disable it per deployment.
+"""
+
+import asyncio
+import logging
+import time
+from threading import Lock
+
+from app.config import PACING_ENABLED, PACING_TURN_SECONDS
+
+logger = logging.getLogger(__name__)
+
+_stats_lock = Lock()
+_stats = {"requests": 0, "paced": 0, "delaySeconds": 0.0}
+
+
+def pacing_delay(session_start: float, turn_number: int,
+                 request_start: float, now: float | None = None) -> float:
+    """
+    Seconds still to wait before answering this request.
+
+    Args:
+        session_start: Session ``startTime`` (epoch seconds)
+        turn_number: Number of messages in the conversation so far
+        request_start: When this request arrived (epoch seconds)
+        now: Current time (defaults to time.time())
+
+    Returns:
+        The smaller of the session's schedule deficit and what remains of
+        this request's PACING_TURN_SECONDS budget (0 if neither applies)
+    """
+    if not PACING_ENABLED or PACING_TURN_SECONDS <= 0:
+        return 0.0
+    now = time.time() if now is None else now
+
+    behind_schedule = turn_number * PACING_TURN_SECONDS - (now - (session_start or request_start))
+    request_remaining = PACING_TURN_SECONDS - (now - request_start)
+    return max(0.0, min(behind_schedule, request_remaining))
+
+
+async def pace_response(session: dict, turn_number: int, request_start: float) -> float:
+    """
+    Await the remaining pacing gap for this request (call just before
+    responding, once the real work is done).
+
+    Returns:
+        The delay that was applied, in seconds
+    """
+    delay = pacing_delay(session.get("startTime", 0), turn_number, request_start)
+    with _stats_lock:
+        _stats["requests"] += 1
+        if delay > 0:
+            _stats["paced"] += 1
+            _stats["delaySeconds"] += delay
+    if delay > 0:
+        logger.info(f"Pacing: holding reply {delay:.2f}s "
+                    f"(processing took {time.time() - request_start:.2f}s)")
+        await asyncio.sleep(delay)
+    return delay
+
+
+def pacing_stats() -> dict:
+    """Counters for metrics/logging: requests seen, requests delayed, total delay."""
+    with _stats_lock:
+        return {**_stats, "delaySeconds": round(_stats["delaySeconds"], 2)}
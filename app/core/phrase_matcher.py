@@ -0,0 +1,94 @@
+"""
+Phrase Matcher
+==============
+Aho-Corasick automaton for the fixed phrase lists scattered through the
+app (suspicious keywords, scam indicators, agent guardrail phrases).
+
+Checking ``phrase in text`` for every phrase costs one substring search
+per phrase, so each phrase added to a list makes every message slower.
+The automaton is built once at import and then finds every phrase in a
+single pass over the text — cost is linear in text length no matter how
+many phrases the list holds.
+
+Matching is plain substring matching, exactly like ``in``: phrases and
+text are compared as given, so callers lowercase the text themselves
+(all phrase lists are lowercase).
+"""
+
+from collections import deque
+from typing import Iterable
+
+
+class PhraseMatcher:
+    """Finds which phrases of a fixed list occur in a text, in one pass."""
+
+    def __init__(self, phrases: Iterable[str]):
+        self.phrases = list(phrases)
+
+        # Trie: goto[state][char] -> state; out[state] -> phrase indexes
+        goto: list[dict] = [{}]
+        out: list[tuple] = [()]
+        for index, phrase in enumerate(self.phrases):
+            if not phrase:
+                raise ValueError("PhraseMatcher phrases must be non-empty")
+            state = 0
+            for ch in phrase:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto.append({})
+                    out.append(())
+                    goto[state][ch] = nxt
+                state = nxt
+            out[state] += (index,)
+
+        # Breadth-first: fold failure links into a full transition table, so
+        # matching is one dict lookup per character with no fail-chasing.
+        # delta[state] holds only non-root targets; missing means "root".
+        delta: list[dict] = [dict(goto[0])] + [None] * (len(goto) - 1)
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            fallback = delta[fail[state]]
+            for ch, nxt in goto[state].items():
+                fail[nxt] = fallback.get(ch, 0)
+                out[nxt] += out[fail[nxt]]
+                queue.append(nxt)
+            delta[state] = {**fallback, **goto[state]}
+
+        self._delta = delta
+        self._out = out
+
+    def __len__(self) -> int:
+        return len(self.phrases)
+
+    def _matched_indexes(self, text: str, first_only: bool = False) -> set:
+        delta = self._delta
+        out = self._out
+        found = set()
+        state = 0
+        for ch in text:
+            state = delta[state].get(ch, 0)
+            if out[state]:
+                found.update(out[state])
+                if first_only:
+                    break
+        return found
+
+    def find(self, text: str) -> list[str]:
+        """
+        Phrases that occur in ``text``.
+
+        Args:
+            text: Text to search (compared as-is; lowercase it first)
+
+        Returns:
+            Matching phrases in their original list order — the same list
+            ``[p for p in phrases if p in text]`` would produce
+        """
+        return [self.phrases[i] for i in sorted(self._matched_indexes(text))]
+
+    def contains_any(self, text: str) -> bool:
+        """True if any phrase occurs in ``text`` (stops at the first hit)."""
+        return bool(self._matched_indexes(text, first_only=True))
@@ -0,0 +1,259 @@
+"""
+Template Reply Engine
+=====================
+Composes in-character agent replies from fragments without calling the
+LLM — a fast path for when provider quota is exhausted, every circuit
+is open, latency budgets are tight, or REPLY_TEMPLATE_MODE=always.
+
+A reply is built from four parts, each chosen at random from a pool so
+consecutive turns don't repeat:
+
+1. A Savita-style opener for the detected scam type (bank, UPI/reward,
+   phishing, lottery/investment, KYC, customs/parcel, or generic)
+2. A red-flag observation for that scam type
+3. The identity question for the turn (mirrors the agent's TURN_STRATEGY)
+4. An elicitation for the highest-priority intel still missing — on
+   turns 6 and 7 always the UPI ID / bank account + IFSC ask
+
+Every red-flag fragment contains a RED_FLAG_INDICATORS phrase and every
+elicitation an ELICITATION_KEYWORDS phrase, so template replies carry
+the same scoring elements the LLM guardrails enforce. The scam type is
+detected from the last few scammer messages only, so composing a reply
+costs microseconds regardless of conversation length.
+"""
+
+import random
+from threading import Lock
+
+from app.core.phrase_matcher import PhraseMatcher
+
+# Scammer phrases that identify the scam type (lowercase)
+SCAM_TYPE_TERMS = {
+    "bank": ["account blocked", "account will be blocked", "account suspended", "bank account",
+             "debit card", "credit card", "net banking", "unauthorized transaction", "sbi", "hdfc",
+             "icici", "atm"],
+    "upi": ["upi", "cashback", "reward", "paytm", "phonepe", "gpay", "google pay", "refund",
+            "collect request"],
+    "phishing": ["click", "link", "http", "www.", "login", "verify your", "portal"],
+    "lottery": ["lottery", "prize", "winner", "won", "jackpot", "investment", "returns",
+                "crypto", "trading", "profit"],
+    "kyc": ["kyc", "aadhaar", "aadhar", "pan card", "pan number", "update your details",
+            "re-verification", "verification pending"],
+    "customs": ["parcel", "courier", "customs", "package", "shipment", "fedex", "dhl",
+                "seized", "tracking"],
+}
+
+_TERM_MATCHER = PhraseMatcher(term for terms in SCAM_TYPE_TERMS.values() for term in terms)
+_TERM_TYPE = {term: scam_type for scam_type, terms in SCAM_TYPE_TERMS.items() for term in terms}
+
+# Scammer messages scanned for the scam type
+SCAM_TYPE_WINDOW = 6
+
+OPENERS = {
+    "bank": [
+        "Arre baba, my account? I am getting so tense now beta...",
+        "Oh my goodness, what happened to my account?",
+        "Haan haan, I am listening beta, but my pension comes in that account only...",
+    ],
+    "upi": [
+        "Oh my goodness, really? Accha...",
+        "Haan beta, cashback sounds nice, but these things make me nervous...",
+        "Accha accha, I am listening, but I don't do much on these phone payment apps...",
+    ],
+    "phishing": [
+        "Accha, accha... let me put on my glasses first.",
+        "Haan beta, I am trying to open it, but my phone is so slow...",
+        "Oh, a link? My daughter-in-law usually does these online things for me...",
+    ],
+    "lottery": [
+        "Haan? I won something? Arre baba...",
+        "Oh my goodness, for me? I never win anything beta...",
+        "Accha, this sounds very nice, but I am a simple retired teacher...",
+    ],
+    "kyc": [
+        "KYC again? Beta, I only did it at the branch last year...",
+        "Haan haan, I have my Aadhaar here somewhere, just wait...",
+        "Accha, I am looking for my papers beta, one minute...",
+    ],
+    "customs": [
+        "Oh my goodness, my parcel is stuck? I was waiting for that only...",
+        "Arre baba, customs? I didn't order anything from outside...",
+        "Haan beta, a parcel? Let me ask my son if he sent something...",
+    ],
+    "generic": [
+        "Accha, I am listening beta...",
+        "Oh my goodness, I don't understand all this properly...",
+        "Haan haan, theek hai, but please go slowly beta...",
+    ],
+}
+
+# Each contains at least one RED_FLAG_INDICATORS phrase
+RED_FLAGS = {
+    "bank": [
+        "It is very unusual that the bank is calling me instead of sending a message in the app.",
+        "My son always said the bank never asks these things on the phone, so I am a bit worried.",
+        "I find it concerning that you want this done so urgently.",
+    ],
+    "upi": [
+        "I have never been asked to pay anything to receive money, that is strange.",
+        "It makes me nervous when someone asks for payments on the phone.",
+        "This seems unusual to me — why would a cashback need anything from my side?",
+    ],
+    "phishing": [
+        "This link looks a bit different from the usual website, that is strange.",
+        "I am a bit worried, my son told me not to open links from unknown numbers.",
+        "It seems unusual that this is not on the official app.",
+    ],
+    "lottery": [
+        "I have heard about such prize calls on the news, so I am a bit hesitant.",
+        "It is strange that I won something I never entered.",
+        "This is the first time anyone told me I won, so I am a little nervous.",
+    ],
+    "kyc": [
+        "My bank always does KYC at the branch, so this is unusual.",
+        "I am a bit worried about giving my details on the phone.",
+        "It is concerning that you say my account will stop over KYC.",
+    ],
+    "customs": [
+        "It is strange that customs would call me directly about a parcel.",
+        "I am a bit worried, I have heard about parcel calls like this.",
+        "Paying a fee on the phone for a parcel seems unusual to me.",
+    ],
+    "generic": [
+        "This all seems quite unusual to me.",
+        "I am a bit worried, this doesn't feel right.",
+        "Something about this makes me nervous, beta.",
+    ],
+}
+
+# Identity question per turn (mirrors the agent's TURN_STRATEGY)
+TURN_QUESTIONS = {
+    1: ["What is your full name, and which company are you calling from?",
+        "Can I ask your good name and which organisation you represent?"],
+    2: ["What is your employee ID and which department are you in?",
+        "Could you tell me your badge number and department name?"],
+    3: ["What is the registered name of your company, and its official website?",
+        "Which official website can I check to verify your company?"],
+    4: ["What is your direct callback number, so I can call you back?",
+        "Can you give me a direct number and extension to call back on?"],
+    5: ["What is the case reference number for this, and when was it filed?",
+        "Could you tell me the complaint reference number? I am writing it in my file."],
+    6: ["Is there any processing fee for this?",
+        "Do I have to pay some verification charge first?"],
+    7: ["Can I do a bank transfer instead?",
+        "Would a normal bank transfer be okay?"],
+    8: ["Can I speak to your senior officer — what is your supervisor's name and designation?",
+        "Who is your supervisor, and what is their direct number?"],
+    9: ["Can you send this in writing? My son wants to see it — what is your official email?",
+        "Could you email me the details? What is your official email address?"],
+    10: ["When will you send the official written notice?",
+         "When can I expect the documents in writing?"],
+}
+
+# (intel key, asks) in probing priority order; each contains an ELICITATION_KEYWORDS phrase
+ELICITATIONS = [
+    ("phoneNumbers", ["Could you share your direct phone number so I can call you back?",
+                      "What is your official number, in case the line drops?"]),
+    ("bankAccounts", ["Which bank account should I use — could you share the account number and IFSC?",
+                      "Can you give me your bank account number and IFSC code?"]),
+    ("upiIds", ["What UPI ID should I send it to?",
+                "Could you share your UPI ID so I can note it down?"]),
+    ("emailAddresses", ["What is your official email address?",
+                        "Can you send me an email with the details? What is your email?"]),
+    ("phishingLinks", ["Can you send me the website link again so my son can check it?",
+                       "What is the official website link for this?"]),
+    ("caseIds", ["What is the case reference number for this?",
+                 "Can you give me the reference number so I can write it down?"]),
+    ("policyNumbers", ["What is the policy number you are referring to?"]),
+    ("orderNumbers", ["What is the order ID or tracking number for this?"]),
+]
+_ELICITATION_BY_KEY = dict(ELICITATIONS)
+
+# Intel the turn's question already asks for — not elicited twice
+_TURN_TARGETS = {4: "phoneNumbers", 5: "caseIds", 9: "emailAddresses"}
+
+# Payment asks forced on turns 6 and 7 (contain UPI_TERMS / BANK_TERMS)
+PAYMENT_ELICITATIONS = {
+    6: ["I prefer UPI only — what is your UPI ID so I can send the amount?",
+        "Can I pay by GPay? Please share your UPI ID."],
+    7: ["Could you please share your bank account number and IFSC code for the transfer?",
+        "Please give me the account number and IFSC code, I will ask my son to do the bank transfer."],
+}
+
+# Asked once nothing is missing any more
+GENERIC_ELICITATIONS = [
+    "Could you share your supervisor's name and number so I can confirm?",
+    "Do you have a WhatsApp number I can reach you on?",
+]
+
+_stats_lock = Lock()
+_stats: dict[str, int] = {}
+
+
+def detect_scam_type(messages: list[dict]) -> str:
+    """
+    Most-mentioned scam type in the last SCAM_TYPE_WINDOW scammer messages.
+
+    Returns:
+        A SCAM_TYPE_TERMS key, or "generic" if no type terms occur
+    """
+    scammer_texts = [
+        m.get("text", "")
+        for m in messages[-2 * SCAM_TYPE_WINDOW:]
+        if str(m.get("sender", "")).lower() == "scammer"
+    ][-SCAM_TYPE_WINDOW:]
+    counts: dict[str, int] = {}
+    for term in _TERM_MATCHER.find(" ".join(scammer_texts).lower()):
+        scam_type = _TERM_TYPE[term]
+        counts[scam_type] = counts.get(scam_type, 0) + 1
+    if not counts:
+        return "generic"
+    # max() keeps the first of equal counts, i.e. SCAM_TYPE_TERMS order
+    return max(counts, key=counts.get)
+
+
+def _elicitation(turn_number: int, extracted_intel: dict | None, rng) -> str:
+    if turn_number in PAYMENT_ELICITATIONS:
+        return rng.choice(PAYMENT_ELICITATIONS[turn_number])
+    intel = extracted_intel or {}
+    target = _TURN_TARGETS.get(turn_number)
+    missing = [key for key, _ in ELICITATIONS if not intel.get(key) and key != target]
+    if not missing:
+        return rng.choice(GENERIC_ELICITATIONS)
+    # Vary between the top two missing items so the same ask doesn't repeat every turn
+    return rng.choice(_ELICITATION_BY_KEY[rng.choice(missing[:2])])
+
+
+def template_reply(messages: list[dict], turn_number: int = 0,
+                   extracted_intel: dict | None = None, reason: str = "template",
+                   rng=random) -> str:
+    """
+    Compose an agent reply without the LLM.
+
+    Args:
+        messages: Conversation as a list of {'sender', 'text'} dicts
+        turn_number: Current turn (drives the identity question)
+        extracted_intel: Intelligence captured so far (drives the elicitation)
+        reason: Why the template path was taken (counted in template_stats())
+        rng: Random source (random module by default)
+
+    Returns:
+        Reply with opener, red-flag observation, question and elicitation
+    """
+    scam_type = detect_scam_type(messages)
+    question = rng.choice(TURN_QUESTIONS.get(turn_number, TURN_QUESTIONS[10]))
+    reply = " ".join((
+        rng.choice(OPENERS[scam_type]),
+        rng.choice(RED_FLAGS[scam_type]),
+        question,
+        _elicitation(turn_number, extracted_intel, rng),
+    ))
+    with _stats_lock:
+        _stats[reason] = _stats.get(reason, 0) + 1
+    return reply
+
+
+def template_stats() -> dict:
+    """Template replies served so far, per reason, for metrics/logging."""
+    with _stats_lock:
+        return dict(_stats)
@@ -21,7 +21,10 @@ or API failures. Scoring target: 20/20 for scamDetected.
 import json
 import re
 import logging
-from app.llm.llm_client import call_cerebras
+from app.llm.llm_client import call_cerebras, acall_cerebras
+from app.core.phrase_matcher import PhraseMatcher
+from app.core.verdict_cache import VerdictCache, verdict_key
+from app.config import VERDICT_CACHE_SIZE, VERDICT_CACHE_TTL, VERDICT_CACHE_PATH
 
 logger = logging.getLogger(__name__)
 
@@ -107,6 +110,12 @@ SCAM_INDICATORS = [
     "ifsc code", "branch code",
 ]
 
+_SCAM_INDICATOR_MATCHER = PhraseMatcher(SCAM_INDICATORS)
+
+# LLM verdicts by normalized conversation — campaign templates that miss
+# the keyword fast path skip the LLM after their first appearance.
+_verdict_cache = VerdictCache(VERDICT_CACHE_SIZE, VERDICT_CACHE_TTL, VERDICT_CACHE_PATH)
+
 
 def _extract_json(text: str) -> dict | None:
     """
@@ -162,7 +171,7 @@ def _keyword_fallback(conversation: str) -> dict:
         Detection result dict with scamDetected, confidence, reasons
     """
     lowered = conversation.lower()
-    hits = [kw for kw in SCAM_INDICATORS if kw in lowered]
+    hits = _SCAM_INDICATOR_MATCHER.find(lowered)
     # Flag as scam if 1+ indicator found (aggressive for max scoring)
     detected = len(hits) >= 1
     return {
@@ -172,6 +181,58 @@ def _keyword_fallback(conversation: str) -> dict:
     }
 
 
+def _keyword_fast_path(conversation: str) -> dict:
+    """Keyword detection result, logged when it already flags a scam."""
+    keyword_result = _keyword_fallback(conversation)
+    if keyword_result["scamDetected"]:
+        logger.info(f"Scam detected by keywords (fast path): {keyword_result['reasons'][:3]}")
+    return keyword_result
+
+
+def _llm_messages(conversation: str) -> list[dict[str, str]]:
+    """Chat messages for the LLM scam classifier."""
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": conversation}
+    ]
+
+
+def _parse_llm_result(raw_output: str) -> dict | None:
+    """Parse the classifier's JSON verdict, or None if it isn't usable."""
+    result = _extract_json(raw_output)
+    if result and "scamDetected" in result:
+        logger.info(f"Scam detection result (LLM): {result}")
+        return result
+
+    logger.warning("Scam detector LLM returned non-JSON — using keyword result")
+    return None
+
+
+def _cached_verdict(key: str) -> dict | None:
+    """Previously stored LLM verdict for this conversation template."""
+    cached = _verdict_cache.get(key)
+    if cached is not None:
+        logger.info(f"Scam verdict cache hit — skipping LLM: {cached}")
+    return cached
+
+
+def _store_verdict(key: str, result: dict | None) -> dict | None:
+    """Cache a parsed LLM verdict (failures are never cached)."""
+    if result is not None:
+        _verdict_cache.put(key, result)
+    return result
+
+
+def verdict_cache_stats() -> dict:
+    """Verdict cache counters for metrics/logging."""
+    return _verdict_cache.stats()
+
+
+def close_verdict_cache() -> None:
+    """Close the verdict persistence file (called on app shutdown)."""
+    _verdict_cache.close()
+
+
 def detect_scam(conversation: str) -> dict:
     """
     Analyze conversation text for scam intent.
@@ -190,27 +251,55 @@ def detect_scam(conversation: str) -> dict:
         return {"scamDetected": False, "confidence": 0, "reasons": ["empty conversation"]}
 
     # === FAST PATH: keyword detection first (instant, <1ms) ===
-    keyword_result = _keyword_fallback(conversation)
+    keyword_result = _keyword_fast_path(conversation)
     if keyword_result["scamDetected"]:
-        logger.info(f"Scam detected by keywords (fast path): {keyword_result['reasons'][:3]}")
         return keyword_result
 
+    # === CACHED VERDICT: same template seen before ===
+    key = verdict_key(conversation)
+    cached = _cached_verdict(key)
+    if cached is not None:
+        return cached
+
     # === SLOW PATH: LLM detection only if keywords missed ===
     try:
-        messages = [
-            {"role": "system", "content": SYSTEM_PROMPT},
-            {"role": "user", "content": conversation}
-        ]
+        raw_output = call_cerebras(_llm_messages(conversation))
+        return _store_verdict(key, _parse_llm_result(raw_output)) or keyword_result
+    except Exception as e:
+        logger.error(f"Scam detection LLM error: {e}")
+
+    return keyword_result
+
+
+async def adetect_scam(conversation: str, use_llm: bool = True) -> dict:
+    """
+    Async version of detect_scam() — awaits the LLM slow path instead of
+    blocking the event loop.
+
+    Args:
+        conversation: Full conversation text to analyze
+        use_llm: False to stop at the keyword/cached verdict (load shedding)
 
-        raw_output = call_cerebras(messages)
+    Returns:
+        Dict with keys: scamDetected (bool), confidence (float), reasons (list)
+    """
+    if not conversation or not conversation.strip():
+        return {"scamDetected": False, "confidence": 0, "reasons": ["empty conversation"]}
 
-        result = _extract_json(raw_output)
-        if result and "scamDetected" in result:
-            logger.info(f"Scam detection result (LLM): {result}")
-            return result
+    keyword_result = _keyword_fast_path(conversation)
+    if keyword_result["scamDetected"]:
+        return keyword_result
 
-        logger.warning("Scam detector LLM returned non-JSON — using keyword result")
+    key = verdict_key(conversation)
+    cached = _cached_verdict(key)
+    if cached is not None:
+        return cached
+    if not use_llm:
+        return keyword_result
 
+    try:
+        raw_output = await acall_cerebras(_llm_messages(conversation))
+        return _store_verdict(key, _parse_llm_result(raw_output)) or keyword_result
     except Exception as e:
         logger.error(f"Scam detection LLM error: {e}")
 
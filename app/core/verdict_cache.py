@@ -0,0 +1,127 @@
+"""
+Scam Verdict Cache
+==================
+Caches LLM scam-detection verdicts by a hash of the normalized
+conversation, so campaign templates that miss the keyword fast path
+only pay the LLM round-trip once.
+
+Normalization makes near-identical texts share a key: lowercase,
+digit runs collapsed to '#' (phone numbers, amounts, case IDs differ
+per victim) and whitespace collapsed.
+
+- Bounded by an LRU (app.cache.LRUCache); entries expire ``ttl``
+  seconds after they were stored (wall clock, so persisted entries keep
+  their original expiry across restarts).
+- Optional persistence: with a ``path``, each new verdict is appended to
+  a JSONL file and live entries are reloaded at startup. The file is
+  rewritten without expired/superseded lines when it grows to twice the
+  live entry count.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from threading import Lock
+
+from app.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+_DIGITS_REGEX = re.compile(r"\d+")
+_SPACE_REGEX = re.compile(r"\s+")
+
+
+def normalize_conversation(text: str) -> str:
+    """Lowercase, mask digit runs and collapse whitespace."""
+    text = _DIGITS_REGEX.sub("#", (text or "").lower())
+    return _SPACE_REGEX.sub(" ", text).strip()
+
+
+def verdict_key(text: str) -> str:
+    """Cache key for a conversation: 128-bit digest of its normalized form."""
+    normalized = normalize_conversation(text)
+    return hashlib.blake2b(normalized.encode("utf-8", "replace"), digest_size=16).hexdigest()
+
+
+class VerdictCache:
+    """LRU + TTL verdict cache with optional JSONL persistence."""
+
+    def __init__(self, maxsize: int, ttl: float, path: str = ""):
+        self.ttl = ttl
+        self.path = path
+        self._cache = LRUCache(maxsize)  # key -> (verdict, expires_at)
+        self._lock = Lock()
+        self._file = None
+        if path:
+            self._load()
+
+    def get(self, key: str) -> dict | None:
+        """Cached verdict (a copy) or None if missing/expired."""
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        verdict, expires_at = entry
+        if time.time() >= expires_at:
+            self._cache.pop(key)
+            return None
+        return dict(verdict)
+
+    def put(self, key: str, verdict: dict) -> None:
+        """Store a verdict (and append it to the persistence file)."""
+        expires_at = time.time() + self.ttl
+        verdict = dict(verdict)
+        self._cache.set(key, (verdict, expires_at))
+        if self._file is not None:
+            line = json.dumps({"key": key, "verdict": verdict, "expires": expires_at})
+            try:
+                with self._lock:
+                    self._file.write(line + "\n")
+                    self._file.flush()
+            except Exception as e:
+                logger.error(f"Verdict cache write failed: {e}")
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    # ---------- persistence ----------
+
+    def _load(self) -> None:
+        now = time.time()
+        lines = 0
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        lines += 1
+                        try:
+                            record = json.loads(line)
+                        except json.JSONDecodeError:
+                            continue  # torn final line from a crash
+                        if record.get("expires", 0) > now:
+                            self._cache.set(record["key"], (record["verdict"], record["expires"]))
+            if lines >= 2 * max(len(self._cache), 1) and lines > 0:
+                self._rewrite()
+            self._file = open(self.path, "a", encoding="utf-8")
+            logger.info(f"Verdict cache loaded {len(self._cache)} entries from {self.path}")
+        except Exception as e:
+            logger.error(f"Verdict cache persistence disabled ({self.path}): {e}")
+            self._file = None
+
+    def _rewrite(self) -> None:
+        """Compact the file down to the live entries (atomic replace)."""
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for key, (verdict, expires_at) in self._cache.items():
+                f.write(json.dumps({"key": key, "verdict": verdict, "expires": expires_at}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,173 @@
+"""
+Provider Circuit Breaker
+========================
+Per-provider health tracking for llm_client, so an outage or rate limit
+costs one failed call instead of a timeout on every request.
+
+States:
+    closed    — calls flow; outcomes are recorded in a rolling window
+    open      — calls are skipped until ``open_until`` (retry-after or
+                cooldown), so routing goes straight to the next provider
+    half-open — after the cooldown one probe call is let through; success
+                closes the circuit, failure re-opens it with a doubled
+                cooldown (capped at ``max_cooldown``)
+
+The circuit opens on a 429 (for the provider's ``retry-after`` when
+given), after ``consecutive_limit`` failures in a row, or when the error
+rate over the last ``window`` calls reaches ``error_rate_limit``.
+
+A closed provider can still be *degraded* (elevated error rate or slow
+responses); routing tries degraded providers after healthy ones.
+"""
+
+import time
+from collections import deque
+from threading import Lock
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class CircuitBreaker:
+    """Rolling-window circuit breaker for one LLM provider."""
+
+    def __init__(self, name: str, window: int = 20, min_calls: int = 5,
+                 error_rate_limit: float = 0.5, consecutive_limit: int = 3,
+                 cooldown: float = 30.0, max_cooldown: float = 300.0,
+                 slow_latency: float = 10.0, probe_timeout: float = 30.0):
+        self.name = name
+        self.min_calls = min_calls
+        self.error_rate_limit = error_rate_limit
+        self.consecutive_limit = consecutive_limit
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.slow_latency = slow_latency
+        self.probe_timeout = probe_timeout
+
+        self._lock = Lock()
+        self._calls: deque = deque(maxlen=max(1, window))  # (ok, latency)
+        self._state = CLOSED
+        self._open_until = 0.0
+        self._cooldown = cooldown
+        self._consecutive_failures = 0
+        self._probe_started: float | None = None
+
+        self.opened = 0
+        self.skipped = 0
+
+    # ---------- routing queries ----------
+
+    def available(self) -> bool:
+        """True if a call would be allowed now (does not take the probe)."""
+        with self._lock:
+            now = time.monotonic()
+            if self._state == CLOSED:
+                return True
+            if now < self._open_until:
+                return False
+            return not self._probe_leased(now)
+
+    def allow_request(self) -> bool:
+        """
+        Gate an actual call. In half-open state this leases the single
+        probe slot; callers must then record an outcome or release().
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self._state == CLOSED:
+                return True
+            if now < self._open_until or self._probe_leased(now):
+                self.skipped += 1
+                return False
+            self._state = HALF_OPEN
+            self._probe_started = now
+            return True
+
+    def release(self) -> None:
+        """Give back a probe lease without an outcome (call was cancelled)."""
+        with self._lock:
+            self._probe_started = None
+
+    @property
+    def degraded(self) -> bool:
+        """
+        Closed but unhealthy: elevated error rate or slow responses.
+        Never true for a probe-eligible circuit, so routing keeps its
+        preference order and the probe actually gets sent.
+        """
+        with self._lock:
+            if self._state != CLOSED:
+                return False
+            return ((len(self._calls) >= self.min_calls
+                     and self._error_rate() >= self.error_rate_limit / 2)
+                    or self._mean_latency() >= self.slow_latency)
+
+    # ---------- outcomes ----------
+
+    def record_success(self, latency: float) -> None:
+        with self._lock:
+            self._calls.append((True, latency))
+            self._consecutive_failures = 0
+            if self._state != CLOSED:
+                # Probe succeeded — start fresh
+                self._state = CLOSED
+                self._cooldown = self.base_cooldown
+                self._probe_started = None
+                self._calls.clear()
+                self._calls.append((True, latency))
+
+    def record_failure(self, latency: float, retry_after: float | None = None) -> None:
+        with self._lock:
+            self._calls.append((False, latency))
+            self._consecutive_failures += 1
+
+            if self._state == HALF_OPEN:
+                # Probe failed — back off harder
+                self._cooldown = min(self._cooldown * 2, self.max_cooldown)
+                self._open(retry_after)
+            elif self._state == OPEN:
+                pass  # late result of a call started before the circuit opened
+            elif (retry_after is not None
+                    or self._consecutive_failures >= self.consecutive_limit
+                    or (len(self._calls) >= self.min_calls
+                        and self._error_rate() >= self.error_rate_limit)):
+                self._open(retry_after)
+
+    # ---------- internals (lock held) ----------
+
+    def _open(self, retry_after: float | None) -> None:
+        wait = self._cooldown if retry_after is None else min(max(retry_after, 0.0), self.max_cooldown)
+        self._state = OPEN
+        self._open_until = time.monotonic() + wait
+        self._probe_started = None
+        self.opened += 1
+
+    def _probe_leased(self, now: float) -> bool:
+        return self._probe_started is not None and now - self._probe_started < self.probe_timeout
+
+    def _error_rate(self) -> float:
+        if not self._calls:
+            return 0.0
+        return sum(1 for ok, _ in self._calls if not ok) / len(self._calls)
+
+    def _mean_latency(self) -> float:
+        latencies = [lat for ok, lat in self._calls if ok]
+        return sum(latencies) / len(latencies) if latencies else 0.0
+
+    def stats(self) -> dict:
+        """Health snapshot for metrics/logging."""
+        with self._lock:
+            now = time.monotonic()
+            state = self._state
+            if state == OPEN and now >= self._open_until:
+                state = HALF_OPEN
+            return {
+                "state": state,
+                "retryIn": round(max(self._open_until - now, 0.0), 1) if state == OPEN else 0.0,
+                "errorRate": round(self._error_rate(), 3),
+                "meanLatency": round(self._mean_latency(), 3),
+                "calls": len(self._calls),
+                "opened": self.opened,
+                "skipped": self.skipped,
+            }
@@ -16,6 +16,27 @@ Exports:
                       Used by agent.py for conversation replies.
     call_cerebras()  — Direct Cerebras call (for scam detection,
                       saves Groq tokens for agent replies).
+    acall_llm() / acall_cerebras()
+                    — Async equivalents on pooled httpx clients, used by
+                      the async endpoint so a slow provider call never
+                      blocks the event loop for other sessions.
+                      acall_llm() can hedge: if Groq hasn't answered
+                      within LLM_HEDGE_DELAY, Cerebras is raced against it.
+                      With ``stop_when``, replies are streamed (SSE) and
+                      the stream is closed as soon as the partial text is
+                      good enough, so the provider stops generating.
+    aclose_llm_clients() — Close the async clients (app shutdown).
+    provider_health() — Circuit-breaker and quota state per provider.
+
+Each provider has a circuit breaker (see circuit_breaker.py): 429s open it
+for the provider's retry-after, repeated errors/timeouts open it for a
+cooldown, and routing skips open providers and tries degraded ones last —
+Groq stays preferred whenever it is healthy.
+
+Each provider also has local RPM/TPM token buckets (see rate_limiter.py)
+sized to its free-tier quota. A call reserves one request plus its
+estimated tokens; it waits briefly if the quota refills soon, otherwise
+it is rerouted to the next provider without a wasted 429 round-trip.
 
 The 70B model dramatically improves Conversation Quality scoring (30 pts)
 because it follows the complex system prompt much more reliably than 8B,
@@ -23,11 +44,26 @@ consistently producing red flags + investigative questions + elicitation
 in every response.
 """
 
+import asyncio
+import httpx
+import json
 import requests
 import random
 import logging
 import time
-from app.config import CEREBRAS_API_KEY, GROQ_API_KEY
+from email.utils import parsedate_to_datetime
+from threading import Lock
+from typing import Callable
+from app.config import (
+    CEREBRAS_API_KEY, GROQ_API_KEY, LLM_MAX_CONNECTIONS,
+    LLM_HEDGE_ENABLED, LLM_HEDGE_DELAY,
+    LLM_BREAKER_COOLDOWN, LLM_BREAKER_ERROR_RATE, LLM_BREAKER_WINDOW,
+    LLM_SLOW_LATENCY, LLM_QUEUE_MAX_WAIT,
+    GROQ_RPM, GROQ_TPM, CEREBRAS_RPM, CEREBRAS_TPM,
+)
+from app.llm.circuit_breaker import CircuitBreaker
+from app.llm.rate_limiter import ProviderRateLimiter
+from app.llm.tokens import estimate_message_tokens, estimate_tokens
 
 logger = logging.getLogger(__name__)
 
@@ -39,6 +75,193 @@ GROQ_MODEL = "llama-3.3-70b-versatile"
 CEREBRAS_API_URL = "https://api.cerebras.ai/v1/chat/completions"
 CEREBRAS_MODEL = "llama3.1-8b"
 
+# Reply-generation routing candidates, in preference order:
+# name → (label, api_url, model, max_tokens)
+# 70B is concise and needs fewer tokens; 8B needs more for a full response.
+REPLY_PROVIDERS = {
+    "groq": ("Groq", GROQ_API_URL, GROQ_MODEL, 300),
+    "cerebras": ("Cerebras", CEREBRAS_API_URL, CEREBRAS_MODEL, 350),
+}
+REPLY_TIMEOUT = 25
+
+# ====== Provider Health ======
+
+_breakers: dict[str, CircuitBreaker] = {
+    name: CircuitBreaker(
+        name,
+        window=LLM_BREAKER_WINDOW,
+        error_rate_limit=LLM_BREAKER_ERROR_RATE,
+        cooldown=LLM_BREAKER_COOLDOWN,
+        slow_latency=LLM_SLOW_LATENCY,
+    )
+    for name in REPLY_PROVIDERS
+}
+_limiters: dict[str, ProviderRateLimiter] = {
+    "groq": ProviderRateLimiter("groq", GROQ_RPM, GROQ_TPM),
+    "cerebras": ProviderRateLimiter("cerebras", CEREBRAS_RPM, CEREBRAS_TPM),
+}
+_provider_by_url = {api_url: name for name, (_, api_url, _, _) in REPLY_PROVIDERS.items()}
+
+
+def _breaker_for(api_url: str) -> CircuitBreaker | None:
+    """Circuit breaker for a known provider URL (None for ad-hoc URLs)."""
+    name = _provider_by_url.get(api_url)
+    return _breakers.get(name) if name else None
+
+
+def _limiter_for(api_url: str) -> ProviderRateLimiter | None:
+    """Quota limiter for a known provider URL (None for ad-hoc URLs)."""
+    name = _provider_by_url.get(api_url)
+    return _limiters.get(name) if name else None
+
+
+def _reserve_quota(limiter: ProviderRateLimiter | None, model: str,
+                   messages: list[dict[str, str]], max_tokens: int) -> tuple[int, float] | None:
+    """
+    Reserve local quota for one call.
+
+    Returns:
+        (reserved tokens, seconds to wait before sending), or None if the
+        quota won't refill within LLM_QUEUE_MAX_WAIT — reroute instead
+    """
+    if limiter is None:
+        return 0, 0.0
+    reserved = estimate_message_tokens(messages) + max_tokens
+    wait = limiter.reserve(reserved, max_wait=LLM_QUEUE_MAX_WAIT)
+    if wait is None:
+        logger.info(f"{model} local quota exhausted — rerouting")
+        return None
+    if wait > 0:
+        logger.info(f"{model} local quota — queueing {wait:.2f}s")
+    return reserved, wait
+
+
+def _settle_quota(limiter: ProviderRateLimiter | None, reserved: int, response) -> None:
+    """True up a reservation with the tokens the provider actually used."""
+    if limiter is None:
+        return
+    if response is None:
+        limiter.settle(reserved, 0)  # never sent
+    elif response.status_code == 429 or response.status_code >= 500:
+        limiter.settle(reserved, 0)  # rejected — not counted against TPM
+    else:
+        usage = _response_usage(response)
+        limiter.settle(reserved, usage.get("total_tokens") if usage else None)
+
+
+def _response_usage(response) -> dict | None:
+    """The ``usage`` block of a successful non-streamed completion."""
+    if response.status_code >= 300:
+        return None
+    try:
+        return response.json().get("usage")
+    except Exception:
+        return None
+
+
+_usage_lock = Lock()
+_usage_totals: dict[str, dict] = {
+    name: {"calls": 0, "promptTokens": 0, "cachedTokens": 0, "completionTokens": 0}
+    for name in REPLY_PROVIDERS
+}
+
+
+def _note_usage(api_url: str, model: str, usage: dict | None, latency: float) -> None:
+    """
+    Log a call's reported token usage — including prompt tokens served from
+    the provider's prompt cache — and add it to the per-provider totals.
+    """
+    if not usage:
+        return
+    prompt = usage.get("prompt_tokens") or 0
+    cached = (usage.get("prompt_tokens_details") or {}).get("cached_tokens") or 0
+    completion = usage.get("completion_tokens") or 0
+    logger.info(f"{model} usage: prompt={prompt} (cached={cached}), "
+                f"completion={completion}, latency={latency:.2f}s")
+
+    name = _provider_by_url.get(api_url)
+    if name is None:
+        return
+    with _usage_lock:
+        totals = _usage_totals[name]
+        totals["calls"] += 1
+        totals["promptTokens"] += prompt
+        totals["cachedTokens"] += cached
+        totals["completionTokens"] += completion
+
+
+def _parse_retry_after(value: str | None) -> float | None:
+    """Seconds from a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def _record_response(breaker: CircuitBreaker | None, response, latency: float) -> None:
+    """Feed an HTTP response into the provider's circuit breaker."""
+    if breaker is None:
+        return
+    status = response.status_code
+    if status == 429:
+        # Open for the provider's retry-after, or the cooldown if it gave none
+        retry_after = _parse_retry_after(response.headers.get("retry-after"))
+        breaker.record_failure(latency, retry_after=breaker.base_cooldown if retry_after is None else retry_after)
+    elif status >= 500 or status in (401, 403):
+        breaker.record_failure(latency)
+    else:
+        breaker.record_success(latency)
+
+
+def _api_key(name: str) -> str:
+    return GROQ_API_KEY if name == "groq" else CEREBRAS_API_KEY
+
+
+def _reply_route() -> list[str]:
+    """
+    Reply providers to try, best first.
+
+    Groq is preferred for quality, but providers with an open circuit are
+    skipped and degraded ones (elevated errors or slow) are tried last.
+    """
+    names = [name for name in REPLY_PROVIDERS if name != "groq" or GROQ_API_KEY]
+    healthy = [name for name in names if _breakers[name].available()]
+    # sorted() is stable, so preference order holds among equals
+    return sorted(healthy, key=lambda name: _breakers[name].degraded)
+
+
+def reply_available(prompt_tokens: int) -> bool:
+    """
+    Whether any reply provider could take a call now: its circuit is not
+    open and its quota would admit the request within LLM_QUEUE_MAX_WAIT.
+    Nothing is reserved — this is a cheap pre-check for skipping the LLM.
+
+    Args:
+        prompt_tokens: Estimated prompt tokens of the call
+    """
+    for name in _reply_route():
+        max_tokens = REPLY_PROVIDERS[name][3]
+        if _limiters[name].wait_estimate(prompt_tokens + max_tokens) <= LLM_QUEUE_MAX_WAIT:
+            return True
+    return False
+
+
+def provider_health() -> dict:
+    """Circuit-breaker, quota and token-usage snapshot per provider, for logging/metrics."""
+    with _usage_lock:
+        usage = {name: dict(totals) for name, totals in _usage_totals.items()}
+    return {
+        name: {**breaker.stats(), "quota": _limiters[name].stats(), "usage": usage[name]}
+        for name, breaker in _breakers.items()
+    }
+
+
 # ====== HTTP Connection Pooling ======
 # Reuse TCP+TLS connections across requests — saves ~100-200ms per call
 # that would otherwise be spent on TCP handshake + TLS negotiation.
@@ -70,6 +293,40 @@ def _get_cerebras_session() -> requests.Session:
         })
     return _cerebras_session
 
+
+# Async clients — one pooled httpx.AsyncClient per provider, created lazily
+# on first use (inside the running event loop) and closed on shutdown.
+_async_clients: dict[str, httpx.AsyncClient] = {}
+
+
+def _get_async_client(api_url: str, api_key: str) -> httpx.AsyncClient:
+    """Lazily initialize and return the pooled async client for a provider."""
+    client = _async_clients.get(api_url)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            headers={
+                "Authorization": f"Bearer {api_key}",
+                "Content-Type": "application/json"
+            },
+            limits=httpx.Limits(
+                max_connections=LLM_MAX_CONNECTIONS,
+                max_keepalive_connections=LLM_MAX_CONNECTIONS,
+            ),
+        )
+        _async_clients[api_url] = client
+    return client
+
+
+async def aclose_llm_clients() -> None:
+    """Close every pooled async client (called on app shutdown)."""
+    clients = list(_async_clients.values())
+    _async_clients.clear()
+    for client in clients:
+        try:
+            await client.aclose()
+        except Exception as e:
+            logger.error(f"Error closing LLM client: {e}")
+
 # Safety refusal phrases — if LLM returns these, use fallback instead
 REFUSAL_PHRASES = [
     "cannot assist", "can't assist", "cannot help", "cannot provide",
@@ -92,6 +349,70 @@ FALLBACK_REPLIES = [
 ]
 
 
+def _build_payload(model: str, messages: list[dict[str, str]],
+                   temperature: float, max_tokens: int) -> dict:
+    """OpenAI-compatible chat completion request body."""
+    return {
+        "model": model,
+        "messages": messages,
+        "temperature": temperature,
+        "max_tokens": max_tokens
+    }
+
+
+def _read_completion(response, model: str) -> str | None:
+    """
+    Validate a chat completion response and return its text.
+
+    Works on both ``requests`` and ``httpx`` responses. Returns None on
+    rate limit, server error, safety refusal, or empty output so the
+    caller falls back to the next provider.
+    """
+    if not _response_ok(response, model):
+        return None
+
+    content = response.json()["choices"][0]["message"]["content"]
+    return _check_content(content, model)
+
+
+def _response_ok(response, model: str) -> bool:
+    """
+    False on rate limit or server error (caller falls back to the next
+    provider); raises on other HTTP errors.
+    """
+    # Rate limit — fall back to the next provider
+    if response.status_code == 429:
+        retry_after = response.headers.get("retry-after", "?")
+        logger.warning(f"{model} rate limited (429), retry-after={retry_after}")
+        return False
+
+    # Server error — fall back to the next provider
+    if response.status_code >= 500:
+        logger.warning(f"{model} server error ({response.status_code})")
+        return False
+
+    response.raise_for_status()
+    return True
+
+
+def _check_content(content: str, model: str) -> str | None:
+    """Reject safety refusals and empty output; returns the stripped text."""
+    content = content.strip()
+
+    # Guard against safety refusals
+    content_lower = content.lower()
+    if any(phrase in content_lower for phrase in REFUSAL_PHRASES):
+        logger.warning(f"{model} safety refusal detected")
+        return None
+
+    # Guard against empty/useless responses
+    if not content or len(content) < 10:
+        logger.warning(f"{model} returned empty/short response")
+        return None
+
+    return content
+
+
 def _call_provider(api_url: str, api_key: str, model: str,
                    messages: list[dict[str, str]], temperature: float,
                    max_tokens: int, timeout: int) -> str | None:
@@ -119,49 +440,179 @@ def _call_provider(api_url: str, api_key: str, model: str,
             "Content-Type": "application/json"
         }
 
-    payload = {
-        "model": model,
-        "messages": messages,
-        "temperature": temperature,
-        "max_tokens": max_tokens
-    }
+    breaker = _breaker_for(api_url)
+    if breaker is not None and not breaker.allow_request():
+        logger.info(f"{model} circuit open — skipping")
+        return None
+
+    limiter = _limiter_for(api_url)
+    quota = _reserve_quota(limiter, model, messages, max_tokens)
+    if quota is None:
+        if breaker is not None:
+            breaker.release()
+        return None
+    reserved, wait = quota
+    if wait > 0:
+        time.sleep(wait)
+
+    payload = _build_payload(model, messages, temperature, max_tokens)
+    start = time.monotonic()
 
     try:
         response = http.post(api_url, headers=headers, json=payload, timeout=timeout)
+        latency = time.monotonic() - start
+        _record_response(breaker, response, latency)
+        _settle_quota(limiter, reserved, response)
+        _note_usage(api_url, model, _response_usage(response), latency)
+        return _read_completion(response, model)
 
-        # Rate limit — return None to trigger fallback
-        if response.status_code == 429:
-            retry_after = response.headers.get("retry-after", "?")
-            logger.warning(f"{model} rate limited (429), retry-after={retry_after}")
-            return None
+    except requests.exceptions.Timeout:
+        if breaker is not None:
+            breaker.record_failure(time.monotonic() - start)
+        logger.warning(f"{model} timeout ({timeout}s)")
+        return None
+
+    except requests.exceptions.RequestException as e:
+        if breaker is not None:
+            breaker.record_failure(time.monotonic() - start)
+        logger.error(f"{model} request failed: {e}")
+        return None
+
+    except Exception as e:
+        logger.error(f"{model} unexpected error: {e}")
+        return None
 
-        # Server error — return None to trigger fallback
-        if response.status_code >= 500:
-            logger.warning(f"{model} server error ({response.status_code})")
-            return None
 
-        response.raise_for_status()
+async def _read_stream(response, model: str, stop_when) -> tuple[str, dict | None]:
+    """
+    Accumulate a streamed (SSE) chat completion.
 
-        content = response.json()["choices"][0]["message"]["content"].strip()
+    Args:
+        response: Open httpx streaming response with a 2xx status
+        model: Model name, for logging
+        stop_when: Called with the text so far after each chunk; returning
+                   a string ends the read early with that text as the result
 
-        # Guard against safety refusals
-        content_lower = content.lower()
-        if any(phrase in content_lower for phrase in REFUSAL_PHRASES):
-            logger.warning(f"{model} safety refusal detected")
-            return None
+    Returns:
+        (generated text, usage block reported by the provider or None —
+        providers only report usage in the final chunk)
+    """
+    parts: list[str] = []
+    usage = None
+    async for line in response.aiter_lines():
+        if not line.startswith("data:"):
+            continue
+        data = line[5:].strip()
+        if data == "[DONE]":
+            break
+        try:
+            chunk = json.loads(data)
+        except ValueError:
+            continue
+
+        usage = chunk.get("usage") or (chunk.get("x_groq") or {}).get("usage") or usage
+
+        delta = "".join((choice.get("delta") or {}).get("content") or ""
+                        for choice in chunk.get("choices") or [])
+        if delta:
+            parts.append(delta)
+            final = stop_when("".join(parts))
+            if final is not None:
+                logger.info(f"{model} stream stopped early at {len(final)} chars")
+                return final, usage
+    return "".join(parts), usage
+
+
+async def _acall_provider(api_url: str, api_key: str, model: str,
+                          messages: list[dict[str, str]], temperature: float,
+                          max_tokens: int, timeout: int,
+                          stop_when=None) -> str | None:
+    """
+    Async version of _call_provider() on a pooled httpx.AsyncClient.
 
-        # Guard against empty/useless responses
-        if not content or len(content) < 10:
-            logger.warning(f"{model} returned empty/short response")
-            return None
+    Awaiting the response yields the event loop, so other sessions keep
+    being served while this provider call is in flight.
 
-        return content
+    With ``stop_when`` the completion is streamed and the stream is closed
+    as soon as ``stop_when(text_so_far)`` returns the text to keep (None =
+    keep reading) — dropping the connection makes the provider stop
+    generating, saving output tokens and time. Refusal/empty checks run on
+    the kept text.
 
-    except requests.exceptions.Timeout:
+    Returns the generated text, or None if the call fails for any reason
+    (rate limit, server error, safety refusal, timeout).
+    """
+    breaker = _breaker_for(api_url)
+    if breaker is not None and not breaker.allow_request():
+        logger.info(f"{model} circuit open — skipping")
+        return None
+
+    limiter = _limiter_for(api_url)
+    quota = _reserve_quota(limiter, model, messages, max_tokens)
+    if quota is None:
+        if breaker is not None:
+            breaker.release()
+        return None
+    reserved, wait = quota
+    if wait > 0:
+        try:
+            await asyncio.sleep(wait)
+        except asyncio.CancelledError:
+            # Cancelled while queued — hand the quota and probe back
+            _settle_quota(limiter, reserved, None)
+            if breaker is not None:
+                breaker.release()
+            raise
+
+    payload = _build_payload(model, messages, temperature, max_tokens)
+    start = time.monotonic()
+
+    try:
+        client = _get_async_client(api_url, api_key)
+        if stop_when is None:
+            response = await client.post(api_url, json=payload, timeout=timeout)
+            latency = time.monotonic() - start
+            _record_response(breaker, response, latency)
+            _settle_quota(limiter, reserved, response)
+            _note_usage(api_url, model, _response_usage(response), latency)
+            return _read_completion(response, model)
+
+        payload["stream"] = True
+        async with client.stream("POST", api_url, json=payload, timeout=timeout) as response:
+            if response.status_code >= 300:
+                await response.aread()
+                _record_response(breaker, response, time.monotonic() - start)
+                _settle_quota(limiter, reserved, response)
+                _response_ok(response, model)
+                return None
+            content, usage = await _read_stream(response, model, stop_when)
+        # Closing the stream early aborts generation; usage then isn't
+        # reported, so settle with the estimate of what was produced
+        latency = time.monotonic() - start
+        _record_response(breaker, response, latency)
+        _note_usage(api_url, model, usage, latency)
+        if limiter is not None:
+            used = usage.get("total_tokens") if usage else None
+            if used is None:
+                used = estimate_message_tokens(messages) + estimate_tokens(content)
+            limiter.settle(reserved, used)
+        return _check_content(content, model)
+
+    except asyncio.CancelledError:
+        # Lost a hedged race — not a provider failure
+        if breaker is not None:
+            breaker.release()
+        raise
+
+    except httpx.TimeoutException:
+        if breaker is not None:
+            breaker.record_failure(time.monotonic() - start)
         logger.warning(f"{model} timeout ({timeout}s)")
         return None
 
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
+        if breaker is not None:
+            breaker.record_failure(time.monotonic() - start)
         logger.error(f"{model} request failed: {e}")
         return None
 
@@ -170,10 +621,12 @@ def _call_provider(api_url: str, api_key: str, model: str,
         return None
 
 
-def call_llm(messages: list[dict[str, str]], temperature: float = 0.7) -> str:
+def call_llm(messages: list[dict[str, str]], temperature: float = 0.7,
+             fallback: Callable[[], str] | None = None) -> str:
     """
     Smart LLM router — tries Groq 70B first for quality, falls back
-    to Cerebras 8B, then to hardcoded fallback replies.
+    to Cerebras 8B, then to hardcoded fallback replies. Providers whose
+    circuit is open are skipped and degraded ones are tried last.
 
     Used by agent.py for conversation reply generation where quality
     matters most (directly impacts 30-point Conversation Quality score).
@@ -187,37 +640,30 @@ def call_llm(messages: list[dict[str, str]], temperature: float = 0.7) -> str:
     Args:
         messages: List of message dicts with 'role' and 'content'
         temperature: Sampling temperature (0.0-1.0)
+        fallback: Produces the reply if every provider fails
+                  (default: a random FALLBACK_REPLIES entry)
 
     Returns:
         Generated text string (always returns something)
     """
-    # === TRY GROQ FIRST (70B — higher quality) ===
-    if GROQ_API_KEY:
+    route = _reply_route()
+    for position, name in enumerate(route):
+        label, api_url, model, max_tokens = REPLY_PROVIDERS[name]
         result = _call_provider(
-            GROQ_API_URL, GROQ_API_KEY, GROQ_MODEL,
+            api_url, _api_key(name), model,
             messages, temperature,
-            max_tokens=300,   # 70B is concise, doesn't need as many tokens
-            timeout=25
+            max_tokens=max_tokens,
+            timeout=REPLY_TIMEOUT
         )
         if result:
-            logger.info(f"LLM response from Groq ({GROQ_MODEL}) — {len(result)} chars")
+            logger.info(f"LLM response from {label} ({model}) — {len(result)} chars")
             return result
-        logger.warning("Groq unavailable — falling back to Cerebras")
-
-    # === FALLBACK TO CEREBRAS (8B — reliable) ===
-    result = _call_provider(
-        CEREBRAS_API_URL, CEREBRAS_API_KEY, CEREBRAS_MODEL,
-        messages, temperature,
-        max_tokens=350,   # 8B needs more tokens to express full response
-        timeout=25
-    )
-    if result:
-        logger.info(f"LLM response from Cerebras ({CEREBRAS_MODEL}) — {len(result)} chars")
-        return result
+        if position + 1 < len(route):
+            logger.warning(f"{label} unavailable — falling back to {REPLY_PROVIDERS[route[position + 1]][0]}")
 
     # === HARDCODED FALLBACK (guarantees conversation continues) ===
     logger.warning("All LLM providers failed — using fallback reply")
-    return random.choice(FALLBACK_REPLIES)
+    return fallback() if fallback else random.choice(FALLBACK_REPLIES)
 
 
 def call_cerebras(messages: list[dict[str, str]], temperature: float = 0.7) -> str:
@@ -246,3 +692,131 @@ def call_cerebras(messages: list[dict[str, str]], temperature: float = 0.7) -> s
 
     logger.warning("Cerebras failed for scam detection — using fallback")
     return random.choice(FALLBACK_REPLIES)
+
+
+def _areply_call(name: str, messages: list[dict[str, str]], temperature: float,
+                 stop_when=None):
+    """Coroutine for one reply-provider leg of acall_llm()."""
+    _, api_url, model, max_tokens = REPLY_PROVIDERS[name]
+    return _acall_provider(
+        api_url, _api_key(name), model,
+        messages, temperature,
+        max_tokens=max_tokens,
+        timeout=REPLY_TIMEOUT,
+        stop_when=stop_when
+    )
+
+
+async def _ahedged(primary: str, secondary: str,
+                   messages: list[dict[str, str]], temperature: float,
+                   stop_when=None) -> str | None:
+    """
+    Hedged race between the two best reply providers.
+
+    The primary starts first. If it has not produced a valid reply within
+    LLM_HEDGE_DELAY seconds (or already failed), the secondary starts too
+    and the first valid, non-refusal reply wins; the other request is
+    cancelled. Returns None only if both providers fail.
+    """
+    first = asyncio.create_task(_areply_call(primary, messages, temperature, stop_when))
+    tasks = {first: primary}
+    primary_label = REPLY_PROVIDERS[primary][0]
+    secondary_label = REPLY_PROVIDERS[secondary][0]
+    try:
+        await asyncio.wait({first}, timeout=LLM_HEDGE_DELAY)
+        if first.done() and first.result():
+            result = first.result()
+            logger.info(f"LLM response from {primary_label} — {len(result)} chars")
+            return result
+
+        if first.done():
+            logger.warning(f"{primary_label} unavailable — falling back to {secondary_label}")
+        else:
+            logger.info(f"{primary_label} slower than {LLM_HEDGE_DELAY}s — hedging with {secondary_label}")
+        second = asyncio.create_task(_areply_call(secondary, messages, temperature, stop_when))
+        tasks[second] = secondary
+
+        pending = {task for task in tasks if not task.done()}
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                result = task.result()
+                if result:
+                    logger.info(f"LLM response from {REPLY_PROVIDERS[tasks[task]][0]} — "
+                                f"{len(result)} chars (hedged)")
+                    return result
+        return None
+
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+
+async def acall_llm(messages: list[dict[str, str]], temperature: float = 0.7,
+                    stop_when=None, fallback: Callable[[], str] | None = None) -> str:
+    """
+    Async version of call_llm() — same health-aware routing
+    (Groq → Cerebras → fallback, open circuits skipped).
+
+    With LLM_HEDGE_ENABLED, the second provider is started in parallel
+    once the first has been pending for LLM_HEDGE_DELAY seconds instead
+    of only after it fails, which cuts the worst case from ~50s to about
+    delay + second-provider latency.
+
+    Args:
+        messages: List of message dicts with 'role' and 'content'
+        temperature: Sampling temperature (0.0-1.0)
+        stop_when: Optional early-stop check on the partial reply (returns
+                   the text to keep, or None to continue);
+                   when given, replies are streamed (see _acall_provider)
+        fallback: Produces the reply if every provider fails
+                  (default: a random FALLBACK_REPLIES entry)
+
+    Returns:
+        Generated text string (always returns something)
+    """
+    route = _reply_route()
+    result = None
+
+    if LLM_HEDGE_ENABLED and len(route) > 1:
+        result = await _ahedged(route[0], route[1], messages, temperature, stop_when)
+    else:
+        for position, name in enumerate(route):
+            label, _, model, _ = REPLY_PROVIDERS[name]
+            result = await _areply_call(name, messages, temperature, stop_when)
+            if result:
+                logger.info(f"LLM response from {label} ({model}) — {len(result)} chars")
+                break
+            if position + 1 < len(route):
+                logger.warning(f"{label} unavailable — falling back to {REPLY_PROVIDERS[route[position + 1]][0]}")
+
+    if result:
+        return result
+
+    logger.warning("All LLM providers failed — using fallback reply")
+    return fallback() if fallback else random.choice(FALLBACK_REPLIES)
+
+
+async def acall_cerebras(messages: list[dict[str, str]], temperature: float = 0.7) -> str:
+    """
+    Async version of call_cerebras() — used by adetect_scam().
+
+    Args:
+        messages: List of message dicts with 'role' and 'content'
+        temperature: Sampling temperature (0.0-1.0)
+
+    Returns:
+        Generated text string (always returns something)
+    """
+    result = await _acall_provider(
+        CEREBRAS_API_URL, CEREBRAS_API_KEY, CEREBRAS_MODEL,
+        messages, temperature,
+        max_tokens=200,
+        timeout=20
+    )
+    if result:
+        return result
+
+    logger.warning("Cerebras failed for scam detection — using fallback")
+    return random.choice(FALLBACK_REPLIES)
@@ -0,0 +1,139 @@
+"""
+Client-Side Rate Limiter
+========================
+Token buckets mirroring each provider's requests-per-minute (RPM) and
+tokens-per-minute (TPM) quotas, so calls are paced locally instead of
+being rejected with a 429 after a wasted round-trip.
+
+Buckets use reservations: a caller deducts its cost up front (the level
+may go negative) and is told how long to wait until the deficit has
+refilled. Waiters are therefore served in arrival order without polling,
+and a burst spends exactly the quota — no more, no less. If the wait
+would exceed the caller's limit nothing is deducted and the caller
+reroutes to another provider instead.
+
+Token costs are estimates (prompt estimate + max_tokens); settle() trues
+them up with the provider's reported usage so unused output tokens
+return to the bucket.
+"""
+
+import time
+from threading import Lock
+
+
+class TokenBucket:
+    """Continuously refilling bucket of ``per_minute`` units."""
+
+    def __init__(self, per_minute: float, burst: float | None = None):
+        self.capacity = float(burst if burst is not None else per_minute)
+        self.rate = per_minute / 60.0  # units per second
+        self.level = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_for(self, amount: float, now: float) -> float:
+        """Seconds until ``amount`` could be taken (refills first)."""
+        self._refill(now)
+        deficit = amount - self.level
+        return deficit / self.rate if deficit > 0 else 0.0
+
+    def take(self, amount: float) -> None:
+        self.level -= amount
+
+    def give(self, amount: float) -> None:
+        self.level = min(self.capacity, self.level + amount)
+
+
+class ProviderRateLimiter:
+    """RPM + TPM buckets for one provider. A limit of 0 disables it."""
+
+    def __init__(self, name: str, rpm: int, tpm: int):
+        self.name = name
+        self._lock = Lock()
+        self._requests = TokenBucket(rpm) if rpm > 0 else None
+        self._tokens = TokenBucket(tpm) if tpm > 0 else None
+
+        self.reserved = 0
+        self.waited = 0
+        self.rejected = 0
+
+    def reserve(self, tokens: int, max_wait: float) -> float | None:
+        """
+        Reserve one request and ``tokens`` tokens.
+
+        Args:
+            tokens: Estimated total tokens (prompt + max output)
+            max_wait: Longest acceptable queueing delay in seconds
+
+        Returns:
+            Seconds the caller must wait before sending (0 = now), or None
+            if that would exceed ``max_wait`` — nothing is reserved then
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self._tokens is not None:
+                # A request larger than the whole bucket can never fit; cap it
+                tokens = min(tokens, self._tokens.capacity)
+            wait = max(
+                self._requests.wait_for(1, now) if self._requests else 0.0,
+                self._tokens.wait_for(tokens, now) if self._tokens else 0.0,
+            )
+            if wait > max_wait:
+                self.rejected += 1
+                return None
+            if self._requests:
+                self._requests.take(1)
+            if self._tokens:
+                self._tokens.take(tokens)
+            self.reserved += 1
+            if wait > 0:
+                self.waited += 1
+            return wait
+
+    def wait_estimate(self, tokens: int) -> float:
+        """Seconds reserve() would ask the caller to wait now (nothing is reserved)."""
+        with self._lock:
+            now = time.monotonic()
+            if self._tokens is not None:
+                tokens = min(tokens, self._tokens.capacity)
+            return max(
+                self._requests.wait_for(1, now) if self._requests else 0.0,
+                self._tokens.wait_for(tokens, now) if self._tokens else 0.0,
+            )
+
+    def settle(self, reserved_tokens: int, used_tokens: int | None) -> None:
+        """
+        True up a reservation once the real usage is known.
+
+        Args:
+            reserved_tokens: Tokens reserved by reserve()
+            used_tokens: Tokens the provider reported (None = unknown, keep
+                         the estimate; 0 = request was not served)
+        """
+        if used_tokens is None or self._tokens is None:
+            return
+        with self._lock:
+            delta = min(reserved_tokens, self._tokens.capacity) - used_tokens
+            if delta > 0:
+                self._tokens.give(delta)
+            else:
+                self._tokens.take(-delta)
+
+    def stats(self) -> dict:
+        with self._lock:
+            now = time.monotonic()
+            snapshot = {
+                "reserved": self.reserved,
+                "waited": self.waited,
+                "rejected": self.rejected,
+            }
+            if self._requests:
+                self._requests.wait_for(0, now)
+                snapshot["requestsAvailable"] = round(self._requests.level, 1)
+            if self._tokens:
+                self._tokens.wait_for(0, now)
+                snapshot["tokensAvailable"] = int(self._tokens.level)
+            return snapshot
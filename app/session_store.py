@@ -1,7 +1,7 @@
 """
 Session Storage Module
 =======================
-Thread-safe JSON-based session persistence for the honeypot.
+Pluggable, thread-safe session persistence for the honeypot.
 
 Each session tracks:
 - Message history
@@ -10,89 +10,788 @@ Each session tracks:
 - Timing for engagement metrics
 - Callback delivery status
 
-Uses file-level locking and atomic writes (write to temp, then replace)
-to prevent data corruption under concurrent access.
+Backends (selected via SESSION_BACKEND in app/config.py):
+
+- ``file``   — LogSessionStore: append-only per-session JSONL log with an
+               in-memory offset index and periodic compaction.
+               Fast, but single-process only.
+- ``memory`` — MemorySessionStore: bounded dict, nothing persisted.
+- ``sqlite`` — SQLiteSessionStore: one row per session, WAL mode so
+               several uvicorn workers on one host can share state.
+- ``redis``  — RedisSessionStore: one key per session on any
+               Redis-protocol server (Redis, KeyDB, Dragonfly, or a local
+               stand-in), shareable across processes and hosts.
+
+Every backend writes only the session that changed, so per-turn
+persistence cost is independent of the total number of sessions.
+
+Durable backends sit behind a bounded LRU cache (SESSION_CACHE_MAX
+entries, SESSION_IDLE_TTL idle expiry) so memory stays bounded under
+sustained traffic; evicted sessions are reloaded lazily on their next turn.
+
+Writes are buffered by a write-behind layer and flushed in coalesced
+batches on a background thread, so request latency never includes
+serialization, disk I/O or fsync. Pending writes are flushed on shutdown.
 """
 
 import json
 import os
+import socket
+import sqlite3
 import time
 import logging
-from threading import Lock
+from threading import Event, Lock, Thread
+from urllib.parse import urlparse, unquote
+
+from app.cache import LRUCache
+from app.config import (
+    SESSION_BACKEND, SESSION_LOG_PATH, SESSION_SQLITE_PATH, SESSION_REDIS_URL,
+    SESSION_CACHE_MAX, SESSION_IDLE_TTL,
+    SESSION_FLUSH_INTERVAL, SESSION_FLUSH_MAX_LATENCY, SESSION_FLUSH_MAX_BATCH,
+)
 
 logger = logging.getLogger(__name__)
 
+# Legacy whole-file snapshot — imported once by the file backend
 SESSION_FILE: str = "sessions.json"
-session_lock: Lock = Lock()
 
-# In-memory cache — avoids repeated disk reads.
-# Sessions are loaded from disk once, then served from memory.
-# Disk writes still happen on update_session for persistence.
-_cache: dict | None = None
 
+def _dumps(data: dict) -> str:
+    """Compact JSON encoding shared by all persistent backends."""
+    return json.dumps(data, separators=(',', ':'))
 
-def load_sessions() -> dict:
+
+class SessionStore:
+    """
+    Interface every session backend implements.
+
+    ``get`` returns the stored session dict (or None if unknown) and
+    ``put`` persists the complete session dict for one session ID.
+    ``put_many`` persists a batch; backends override it when they can
+    write a batch cheaper than one put per session.
     """
-    Load sessions — from memory cache first, disk only on cold start.
 
-    Thread-safe read with corruption recovery — if the file is
-    malformed, returns empty dict instead of crashing.
+    name: str = "base"
 
-    Returns:
-        Dict mapping session IDs to session data
+    def get(self, session_id: str) -> dict | None:
+        raise NotImplementedError
+
+    def put(self, session_id: str, session_data: dict) -> None:
+        raise NotImplementedError
+
+    def put_many(self, items: dict[str, dict]) -> None:
+        for session_id, session_data in items.items():
+            self.put(session_id, session_data)
+
+    def close(self) -> None:
+        """Release file handles / connections. Safe to call twice."""
+
+
+# ==============================
+# IN-MEMORY BACKEND
+# ==============================
+
+class MemorySessionStore(SessionStore):
+    """
+    Process-local store — nothing survives a restart.
+
+    Bounded by the same SESSION_CACHE_MAX / SESSION_IDLE_TTL limits as the
+    session cache; since there is no durable tier, evicted sessions are
+    simply dropped (a returning session starts fresh).
     """
-    global _cache
 
-    # Serve from memory if available (fast path)
-    if _cache is not None:
-        return _cache
+    name = "memory"
 
-    # Cold start: load from disk once
-    if not os.path.exists(SESSION_FILE):
-        _cache = {}
-        return _cache
+    def __init__(self, max_sessions: int = SESSION_CACHE_MAX,
+                 idle_ttl: float = SESSION_IDLE_TTL):
+        self._sessions = LRUCache(max_sessions, ttl=idle_ttl)
 
-    with session_lock:
+    def get(self, session_id: str) -> dict | None:
+        return self._sessions.get(session_id)
+
+    def put(self, session_id: str, session_data: dict) -> None:
+        self._sessions.set(session_id, session_data)
+        self._sessions.expire()
+
+
+# ==============================
+# APPEND-ONLY LOG BACKEND
+# ==============================
+
+class LogSessionStore(SessionStore):
+    """
+    Append-only per-session log.
+
+    Every update appends ONE JSON line ({"id": ..., "data": ...}) for the
+    session that changed. On cold start the log is replayed once to build
+    an index of session ID → byte offset of its latest record; reads seek
+    straight to that record, so memory holds offsets, not session data.
+
+    The log is compacted (latest record per session streamed to a temp
+    file, then atomic replace) once it holds COMPACT_RATIO times more
+    records than there are live sessions, keeping amortized write cost flat.
+    """
+
+    name = "file"
+
+    # Compact once the log holds this many records per live session
+    # (plus a floor so small deployments don't compact on every write).
+    COMPACT_RATIO: int = 4
+    COMPACT_MIN_RECORDS: int = 1000
+
+    def __init__(self, path: str = SESSION_LOG_PATH,
+                 legacy_path: str = SESSION_FILE):
+        self.path = path
+        self.legacy_path = legacy_path
+        self._lock = Lock()
+        self._offsets: dict[str, int] | None = None
+        self._size = 0      # bytes in the log file
+        self._records = 0   # records in the log file (live + superseded)
+        self._writer = None
+        self._reader = None
+
+    @staticmethod
+    def _encode(session_id: str, session_data: dict) -> bytes:
+        return (_dumps({"id": session_id, "data": session_data}) + "\n").encode()
+
+    def _scan(self) -> None:
+        """
+        Replay the log into the offset index, skipping malformed records.
+
+        A torn final line (crash mid-append) is truncated away so the next
+        append starts on a clean line. Caller must hold the lock.
+        """
+        pos = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    logger.warning(f"{self.path} ends with a torn record — truncating")
+                    break
+                try:
+                    record = json.loads(line)
+                    self._offsets[record["id"]] = pos
+                    self._records += 1
+                except (json.JSONDecodeError, KeyError, TypeError):
+                    logger.warning(f"{self.path} has a malformed record — skipping")
+                pos += len(line)
+
+        if pos != os.path.getsize(self.path):
+            with open(self.path, "r+b") as f:
+                f.truncate(pos)
+        self._size = pos
+
+    def _load(self) -> dict[str, int]:
+        """Build the offset index on first use. Caller must hold the lock."""
+        if self._offsets is not None:
+            return self._offsets
+
+        self._offsets = {}
+
+        if os.path.exists(self.path):
+            try:
+                self._scan()
+            except Exception as e:
+                logger.error(f"Failed to replay session log: {e}")
+
+        # Import legacy whole-file snapshot (pre append-only format) by
+        # appending its sessions; later log records still take priority.
+        if self.legacy_path and os.path.exists(self.legacy_path):
+            try:
+                with open(self.legacy_path, "r") as f:
+                    legacy = json.load(f)
+                for session_id, data in legacy.items():
+                    if session_id not in self._offsets:
+                        self._append(session_id, data)
+                os.remove(self.legacy_path)
+                logger.info(f"Imported {len(legacy)} sessions from {self.legacy_path}")
+            except json.JSONDecodeError:
+                logger.warning(f"{self.legacy_path} corrupted — ignoring legacy snapshot")
+            except Exception as e:
+                logger.error(f"Failed to load legacy sessions: {e}")
+
+        return self._offsets
+
+    def _read_at(self, offset: int) -> dict | None:
+        """Read the record starting at ``offset``. Caller must hold the lock."""
+        if self._reader is None or self._reader.closed:
+            self._reader = open(self.path, "rb")
+        self._reader.seek(offset)
         try:
-            with open(SESSION_FILE, "r") as f:
-                _cache = json.load(f)
-        except json.JSONDecodeError:
-            logger.warning("sessions.json corrupted — resetting safely")
-            _cache = {}
-        except Exception as e:
-            logger.error(f"Failed to load sessions: {e}")
-            _cache = {}
+            return json.loads(self._reader.readline())["data"]
+        except (json.JSONDecodeError, KeyError, TypeError):
+            logger.warning(f"{self.path} record at offset {offset} unreadable")
+            return None
+
+    def _append(self, session_id: str, session_data: dict,
+                flush: bool = True) -> None:
+        """Append one record and index it. Caller must hold the lock."""
+        line = self._encode(session_id, session_data)
+        if self._writer is None or self._writer.closed:
+            self._writer = open(self.path, "ab")
+        self._writer.write(line)
+        if flush:
+            self._writer.flush()
+        self._offsets[session_id] = self._size
+        self._size += len(line)
+        self._records += 1
+
+    def _close_handles(self) -> None:
+        for handle in (self._writer, self._reader):
+            if handle is not None and not handle.closed:
+                handle.close()
+        self._writer = None
+        self._reader = None
+
+    def _compact(self) -> None:
+        """
+        Rewrite the log with exactly one record per live session.
+
+        Records are streamed from disk, so compaction never needs every
+        session in memory at once. Write-to-temp + atomic replace means a
+        crash mid-compaction leaves the previous log intact. Caller must
+        hold the lock.
+        """
+        temp_file = self.path + ".tmp"
+        new_offsets: dict[str, int] = {}
+        pos = 0
+        if self._writer is not None and not self._writer.closed:
+            self._writer.flush()
+        with open(self.path, "rb") as src, open(temp_file, "wb") as dst:
+            for session_id, offset in self._offsets.items():
+                src.seek(offset)
+                line = src.readline()
+                dst.write(line)
+                new_offsets[session_id] = pos
+                pos += len(line)
+
+        self._close_handles()
+        os.replace(temp_file, self.path)
+        self._offsets = new_offsets
+        self._size = pos
+        self._records = len(new_offsets)
+
+        logger.info(f"Session log compacted ({self._records} live sessions)")
+
+    def get(self, session_id: str) -> dict | None:
+        with self._lock:
+            offset = self._load().get(session_id)
+            return None if offset is None else self._read_at(offset)
+
+    def _maybe_compact(self) -> None:
+        """Compact if superseded records dominate. Caller must hold the lock."""
+        if self._records > max(self.COMPACT_MIN_RECORDS,
+                               self.COMPACT_RATIO * len(self._offsets)):
+            self._compact()
+
+    def put(self, session_id: str, session_data: dict) -> None:
+        with self._lock:
+            self._load()
+            self._append(session_id, session_data)
+            self._maybe_compact()
+
+    def put_many(self, items: dict[str, dict]) -> None:
+        """Append a batch, then flush + fsync once for the whole batch."""
+        with self._lock:
+            self._load()
+            for session_id, session_data in items.items():
+                self._append(session_id, session_data, flush=False)
+            if self._writer is not None:
+                self._writer.flush()
+                os.fsync(self._writer.fileno())
+            self._maybe_compact()
+
+    def compact(self) -> None:
+        """Force a compaction (e.g. from an admin task)."""
+        with self._lock:
+            self._load()
+            self._compact()
+
+    def close(self) -> None:
+        with self._lock:
+            self._close_handles()
+
+
+# ==============================
+# BOUNDED SESSION CACHE
+# ==============================
+
+class CachedSessionStore(SessionStore):
+    """
+    Bounded LRU + idle-TTL cache in front of a durable backend.
+
+    Hot sessions are served from memory; at most SESSION_CACHE_MAX are
+    kept and any untouched for SESSION_IDLE_TTL seconds are evicted. Writes
+    go through to the backend (or its write-behind buffer, which holds a
+    session until flushed), so an evicted session is never lost and is
+    lazily reloaded from the backend when it comes back.
 
-    return _cache
+    With several workers the cache is per process — route a session to
+    one worker, or use a short SESSION_IDLE_TTL to bound staleness.
+    """
 
+    def __init__(self, backend: SessionStore,
+                 max_sessions: int = SESSION_CACHE_MAX,
+                 idle_ttl: float = SESSION_IDLE_TTL):
+        self.backend = backend
+        self.name = backend.name
+        self._cache = LRUCache(max_sessions, ttl=idle_ttl)
+
+    def get(self, session_id: str) -> dict | None:
+        session = self._cache.get(session_id)
+        if session is None:
+            session = self.backend.get(session_id)
+            if session is not None:
+                self._cache.set(session_id, session)
+        return session
+
+    def put(self, session_id: str, session_data: dict) -> None:
+        self.backend.put(session_id, session_data)
+        self._cache.set(session_id, session_data)
+        self._cache.expire()
+
+    def stats(self) -> dict:
+        """Cache occupancy and hit/eviction counters (+ backend buffer)."""
+        stats = self._cache.stats()
+        if hasattr(self.backend, "stats"):
+            stats["writeBehind"] = self.backend.stats()
+        return stats
+
+    def close(self) -> None:
+        self._cache.clear()
+        self.backend.close()
+
+
+# ==============================
+# WRITE-BEHIND BATCHING
+# ==============================
+
+class WriteBehindSessionStore(SessionStore):
+    """
+    Coalescing write-behind buffer in front of a durable backend.
 
-# ---------- ATOMIC FILE WRITE ----------
+    ``put`` only records the session as dirty (repeat writes to the same
+    session coalesce into one) and returns immediately, so request
+    handlers never wait on serialization, disk I/O or fsync. A daemon
+    flusher thread wakes every ``flush_interval`` seconds and writes all
+    dirty sessions with one ``put_many`` once the oldest has waited
+    ``max_latency`` seconds or ``max_batch`` sessions are pending.
 
-def save_sessions(sessions: dict) -> None:
+    Reads check the dirty buffer first, so pending writes are never lost
+    to a stale backend read. ``close`` performs a final synchronous flush.
     """
-    Persist all sessions to JSON file using atomic write.
 
-    Also updates the in-memory cache so subsequent reads are instant.
+    def __init__(self, backend: SessionStore,
+                 flush_interval: float = SESSION_FLUSH_INTERVAL,
+                 max_latency: float = SESSION_FLUSH_MAX_LATENCY,
+                 max_batch: int = SESSION_FLUSH_MAX_BATCH):
+        self.backend = backend
+        self.name = backend.name
+        self.flush_interval = max(0.01, flush_interval)
+        self.max_latency = max(0.0, max_latency)
+        self.max_batch = max(1, max_batch)
+
+        self._dirty: dict[str, dict] = {}
+        self._oldest_dirty: float | None = None
+        self._lock = Lock()
+        self._flush_lock = Lock()  # serializes batches to the backend
+        self._wake = Event()
+        self._stopped = False
+
+        self.flushes = 0
+        self.flushed_sessions = 0
+        self.coalesced = 0
+
+        self._thread = Thread(target=self._flush_loop, daemon=True,
+                              name="session-flusher")
+        self._thread.start()
+
+    def get(self, session_id: str) -> dict | None:
+        with self._lock:
+            pending = self._dirty.get(session_id)
+        if pending is not None:
+            return pending
+        return self.backend.get(session_id)
+
+    def put(self, session_id: str, session_data: dict) -> None:
+        # Shallow copy: handlers keep mutating top-level keys of the live
+        # session dict while the flusher serializes this snapshot.
+        snapshot = dict(session_data)
+        with self._lock:
+            if session_id in self._dirty:
+                self.coalesced += 1
+            elif not self._dirty:
+                self._oldest_dirty = time.monotonic()
+            self._dirty[session_id] = snapshot
+            full = len(self._dirty) >= self.max_batch
+        if full:
+            self._wake.set()
+
+    def flush(self) -> int:
+        """Write every dirty session to the backend now. Returns the count."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._dirty = self._dirty, {}
+                self._oldest_dirty = None
+            if not batch:
+                return 0
+            try:
+                self.backend.put_many(batch)
+            except Exception as e:
+                logger.error(f"Session flush failed ({len(batch)} sessions): {e}")
+                # Re-queue anything not superseded by a newer write
+                with self._lock:
+                    for session_id, data in batch.items():
+                        self._dirty.setdefault(session_id, data)
+                    if self._dirty and self._oldest_dirty is None:
+                        self._oldest_dirty = time.monotonic()
+                return 0
+            self.flushes += 1
+            self.flushed_sessions += len(batch)
+            return len(batch)
+
+    def _due(self) -> bool:
+        with self._lock:
+            if not self._dirty:
+                return False
+            if len(self._dirty) >= self.max_batch:
+                return True
+            return time.monotonic() - self._oldest_dirty >= self.max_latency
+
+    def _flush_loop(self) -> None:
+        while not self._stopped:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            if self._due():
+                self.flush()
+
+    def stats(self) -> dict:
+        """Buffer depth and flush counters."""
+        return {
+            "pending": len(self._dirty),
+            "flushes": self.flushes,
+            "flushedSessions": self.flushed_sessions,
+            "coalesced": self.coalesced,
+        }
 
-    Args:
-        sessions: Complete sessions dict to persist
+    def close(self) -> None:
+        """Stop the flusher, write everything still pending, close backend."""
+        if not self._stopped:
+            self._stopped = True
+            self._wake.set()
+            self._thread.join(timeout=5)
+            flushed = self.flush()
+            if flushed:
+                logger.info(f"Flushed {flushed} pending sessions on shutdown")
+        self.backend.close()
+
+
+# ==============================
+# SQLITE BACKEND
+# ==============================
+
+class SQLiteSessionStore(SessionStore):
     """
-    global _cache
-    _cache = sessions  # Update memory cache immediately
+    One row per session in SQLite, WAL journal mode.
 
-    temp_file = SESSION_FILE + ".tmp"
+    WAL lets readers in other worker processes proceed while one process
+    writes, so several uvicorn workers on the same host can share state.
+    Each put is a single-row UPSERT.
+    """
 
-    with session_lock:
+    name = "sqlite"
+
+    def __init__(self, path: str = SESSION_SQLITE_PATH):
+        self.path = path
+        self._lock = Lock()
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False,
+                                     isolation_level=None)  # autocommit
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")  # safe with WAL
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            " id TEXT PRIMARY KEY,"
+            " data TEXT NOT NULL,"
+            " updated REAL NOT NULL)"
+        )
+
+    def get(self, session_id: str) -> dict | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM sessions WHERE id = ?", (session_id,)
+            ).fetchone()
+        if row is None:
+            return None
         try:
-            with open(temp_file, "w") as f:
-                json.dump(sessions, f, separators=(',', ':'))  # compact JSON = faster write
-            os.replace(temp_file, SESSION_FILE)
-        except Exception as e:
-            logger.error(f"Failed to save sessions: {e}")
+            return json.loads(row[0])
+        except json.JSONDecodeError:
+            logger.warning(f"Session {session_id} corrupted in SQLite — resetting")
+            return None
+
+    _UPSERT = ("INSERT INTO sessions (id, data, updated) VALUES (?, ?, ?) "
+               "ON CONFLICT(id) DO UPDATE SET data = excluded.data, "
+               "updated = excluded.updated")
+
+    def put(self, session_id: str, session_data: dict) -> None:
+        encoded = _dumps(session_data)
+        with self._lock:
+            self._conn.execute(self._UPSERT, (session_id, encoded, time.time()))
+
+    def put_many(self, items: dict[str, dict]) -> None:
+        """Upsert a batch in a single transaction (one WAL commit)."""
+        now = time.time()
+        rows = [(sid, _dumps(data), now) for sid, data in items.items()]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(self._UPSERT, rows)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def close(self) -> None:
+        with self._lock:
+            try:
+                self._conn.close()
+            except sqlite3.Error:
+                pass
+
+
+# ==============================
+# REDIS-PROTOCOL BACKEND
+# ==============================
+
+class RedisError(Exception):
+    """Error reply returned by a Redis-protocol server."""
+
+
+class RedisSessionStore(SessionStore):
+    """
+    One key per session on a Redis-protocol (RESP) server.
+
+    Speaks the wire protocol directly over a socket (GET/SET only), so it
+    needs no client library and works against Redis, KeyDB, Dragonfly or
+    any local stand-in that implements those commands.
+
+    URL format: redis://[:password@]host[:port][/db]
+    """
+
+    name = "redis"
+    KEY_PREFIX: str = "honeypot:session:"
+
+    def __init__(self, url: str = SESSION_REDIS_URL, timeout: float = 5.0):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.timeout = timeout
+        self._lock = Lock()
+        self._sock: socket.socket | None = None
+        self._reader = None
+
+    # ---------- RESP wire protocol ----------
+
+    def _connect(self) -> None:
+        self._sock = socket.create_connection((self.host, self.port),
+                                              timeout=self.timeout)
+        self._reader = self._sock.makefile("rb")
+        if self.password:
+            self._roundtrip("AUTH", self.password)
+        if self.db:
+            self._roundtrip("SELECT", str(self.db))
+
+    def _disconnect(self) -> None:
+        for closable in (self._reader, self._sock):
+            try:
+                if closable is not None:
+                    closable.close()
+            except OSError:
+                pass
+        self._sock = None
+        self._reader = None
+
+    def _read_reply(self):
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionError("Redis connection closed")
+        prefix, rest = line[:1], line[1:-2]
+        if prefix == b"+":
+            return rest.decode()
+        if prefix == b"-":
+            raise RedisError(rest.decode())
+        if prefix == b":":
+            return int(rest)
+        if prefix == b"$":
+            length = int(rest)
+            if length == -1:
+                return None
+            return self._reader.read(length + 2)[:-2]
+        if prefix == b"*":
+            count = int(rest)
+            return None if count == -1 else [self._read_reply() for _ in range(count)]
+        raise RedisError(f"Unexpected reply prefix {prefix!r}")
+
+    def _roundtrip(self, *args: str):
+        parts = [f"*{len(args)}\r\n".encode()]
+        for arg in args:
+            data = arg.encode() if isinstance(arg, str) else arg
+            parts.append(f"${len(data)}\r\n".encode() + data + b"\r\n")
+        self._sock.sendall(b"".join(parts))
+        return self._read_reply()
+
+    def execute(self, *args: str):
+        """Send one command, reconnecting once if the socket went stale."""
+        with self._lock:
+            for attempt in range(2):
+                try:
+                    if self._sock is None:
+                        self._connect()
+                    return self._roundtrip(*args)
+                except (OSError, ConnectionError):
+                    self._disconnect()
+                    if attempt == 1:
+                        raise
+
+    # ---------- SessionStore ----------
+
+    def get(self, session_id: str) -> dict | None:
+        raw = self.execute("GET", self.KEY_PREFIX + session_id)
+        if raw is None:
+            return None
+        try:
+            return json.loads(raw)
+        except json.JSONDecodeError:
+            logger.warning(f"Session {session_id} corrupted in Redis — resetting")
+            return None
+
+    def put(self, session_id: str, session_data: dict) -> None:
+        self.execute("SET", self.KEY_PREFIX + session_id, _dumps(session_data))
+
+    def put_many(self, items: dict[str, dict]) -> None:
+        """Write a batch with a single MSET round-trip."""
+        if not items:
+            return
+        args = ["MSET"]
+        for session_id, session_data in items.items():
+            args += [self.KEY_PREFIX + session_id, _dumps(session_data)]
+        self.execute(*args)
+
+    def close(self) -> None:
+        with self._lock:
+            self._disconnect()
+
+
+# ==============================
+# BACKEND SELECTION
+# ==============================
+
+_BACKENDS: dict[str, type[SessionStore]] = {
+    "file": LogSessionStore,
+    "memory": MemorySessionStore,
+    "sqlite": SQLiteSessionStore,
+    "redis": RedisSessionStore,
+}
+
+_store: SessionStore | None = None
+_store_lock: Lock = Lock()
+
+
+def create_session_store(backend: str = SESSION_BACKEND) -> SessionStore:
+    """
+    Instantiate the configured backend.
+
+    Durable backends are wrapped in a WriteBehindSessionStore (unless
+    SESSION_FLUSH_INTERVAL is 0) and a bounded CachedSessionStore.
+    Unknown backend names fall back to the file backend with a warning
+    rather than preventing startup.
+    """
+    store_cls = _BACKENDS.get(backend)
+    if store_cls is None:
+        logger.warning(f"Unknown SESSION_BACKEND '{backend}' — using file backend")
+        store_cls = LogSessionStore
+
+    # The memory backend is its own (bounded) cache
+    if store_cls is MemorySessionStore:
+        return MemorySessionStore()
+
+    backend = store_cls()
+    if SESSION_FLUSH_INTERVAL > 0:
+        backend = WriteBehindSessionStore(backend)
+    return CachedSessionStore(backend)
+
+
+def get_session_store() -> SessionStore:
+    """Return the process-wide session store, creating it on first use."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = create_session_store()
+                logger.info(f"Session store backend: {_store.name}")
+    return _store
+
+
+def set_session_store(store: SessionStore) -> None:
+    """Swap the process-wide store (closing the previous one)."""
+    global _store
+    with _store_lock:
+        if _store is not None and _store is not store:
+            _store.close()
+        _store = store
+
+
+def close_session_store() -> None:
+    """Close the process-wide store — called on application shutdown."""
+    global _store
+    with _store_lock:
+        if _store is not None:
+            _store.close()
+        _store = None
 
 
 # ---------- CREATE / FETCH SESSION ----------
 
+def _new_session() -> dict:
+    """Fresh session template with empty intelligence and default flags."""
+    return {
+        # Critical for engagement metrics calculation
+        "startTime": time.time(),
+
+        "messages": [],
+        "totalMessages": 0,
+
+        "scamDetected": False,
+        "agentActive": False,
+        "closed": False,
+        "callbackSent": False,
+
+        # Helps generate evaluator-grade notes
+        "lastAgentReply": "",
+
+        # Rolling summary of turns outside the agent prompt's history budget
+        "historySummary": {},
+
+        "intelligence": {
+            "bankAccounts": [],
+            "upiIds": [],
+            "phishingLinks": [],
+            "phoneNumbers": [],
+            "suspiciousKeywords": [],
+            "emailAddresses": [],
+            "ifscCodes": [],
+            "telegramIds": [],
+            "apkLinks": [],
+            "amounts": [],
+            "organizationsMentioned": [],
+            "remoteAccessTools": [],
+            "caseIds": [],
+            "policyNumbers": [],
+            "orderNumbers": []
+        }
+    }
+
+
 def get_or_create_session(session_id: str) -> dict:
     """
     Retrieve existing session or create a new one.
@@ -100,53 +799,31 @@ def get_or_create_session(session_id: str) -> dict:
     New sessions are initialized with empty intelligence, timing
     data for engagement metrics, and default state flags.
 
+    Storage errors are logged and a fresh session is served so the
+    request can still be answered.
+
     Args:
         session_id: Unique session identifier
 
     Returns:
         Session data dict (existing or newly created)
     """
-    sessions = load_sessions()
-
-    if session_id not in sessions:
-
-        sessions[session_id] = {
-            # Critical for engagement metrics calculation
-            "startTime": time.time(),
-
-            "messages": [],
-            "totalMessages": 0,
-
-            "scamDetected": False,
-            "agentActive": False,
-            "closed": False,
-            "callbackSent": False,
-
-            # Helps generate evaluator-grade notes
-            "lastAgentReply": "",
-
-            "intelligence": {
-                "bankAccounts": [],
-                "upiIds": [],
-                "phishingLinks": [],
-                "phoneNumbers": [],
-                "suspiciousKeywords": [],
-                "emailAddresses": [],
-                "ifscCodes": [],
-                "telegramIds": [],
-                "apkLinks": [],
-                "amounts": [],
-                "organizationsMentioned": [],
-                "remoteAccessTools": [],
-                "caseIds": [],
-                "policyNumbers": [],
-                "orderNumbers": []
-            }
-        }
+    store = get_session_store()
 
-        save_sessions(sessions)
+    try:
+        session = store.get(session_id)
+    except Exception as e:
+        logger.error(f"Failed to load session {session_id}: {e}")
+        session = None
 
-    return sessions[session_id]
+    if session is None:
+        session = _new_session()
+        try:
+            store.put(session_id, session)
+        except Exception as e:
+            logger.error(f"Failed to persist new session {session_id}: {e}")
+
+    return session
 
 
 # ---------- UPDATE SESSION ----------
@@ -155,10 +832,14 @@ def update_session(session_id: str, session_data: dict) -> None:
     """
     Update a session's data in persistent storage.
 
+    Only the changed session is serialized and written, so cost is
+    independent of the total number of sessions.
+
     Args:
         session_id: Unique session identifier
         session_data: Complete updated session data dict
     """
-    sessions = load_sessions()
-    sessions[session_id] = session_data
-    save_sessions(sessions)
+    try:
+        get_session_store().put(session_id, session_data)
+    except Exception as e:
+        logger.error(f"Failed to save session {session_id}: {e}")
@@ -0,0 +1,82 @@
+"""
+Intelligence Extraction Benchmark
+=================================
+Compares the single-pass trigger scanner against running every regex
+over the whole text, and checks both paths return identical results.
+
+Usage:
+    python benchmarks/bench_extraction.py [repeats]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# config.py requires these; the benchmark never calls an LLM.
+os.environ.setdefault("API_KEY", "bench")
+os.environ.setdefault("CEREBRAS_API_KEY", "bench")
+
+from app.core.intelligence import _extract, _scan_triggers, clean_scammer_text  # noqa: E402
+
+SCAMMER_TURNS = [
+    "Dear customer, your SBI account has been BLOCKED due to pending KYC. "
+    "Call our helpline 9876543210 immediately or visit www.sbi-kyc-verify.xyz/update.",
+    "Sir this is from RBI Cyber Cell. Your case no. CYB-2024-78123 is registered. "
+    "Pay Rs. 4,999 to scammer.kyc@ybl to avoid arrest. IFSC SBIN0001234.",
+    "Transfer to account 1234567890123 and share the OTP. WhatsApp +91 87654 32109 "
+    "for the refund of ₹25,000. Download http://bit.ly/refund-app.apk now.",
+    "Your order ORD-998877 from Amazon is on hold. Tracking number TRK123456. "
+    "Install AnyDesk so our Microsoft technician can fix it. Contact @support_desk1.",
+    "Policy number LI-1234567 will lapse. Insurance policy INS998877 needs renewal "
+    "fee of 12,500 rupees. Email claims.desk@gmail.com or toll free 1800-123-4567.",
+]
+
+VICTIM_TURNS = [
+    "Oh no, what happened to my account? I am very worried, please tell me what to do.",
+    "I don't understand these things, my grandson usually helps me with the phone.",
+    "Which branch are you calling from? Can you give me your employee ID first?",
+]
+
+
+def build_conversation(turns: int) -> str:
+    lines = []
+    for i in range(turns):
+        lines.append("scammer: " + SCAMMER_TURNS[i % len(SCAMMER_TURNS)])
+        lines.append("user: " + VICTIM_TURNS[i % len(VICTIM_TURNS)])
+    return "\n".join(lines)
+
+
+def timed(fn, repeats: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+def main() -> None:
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+
+    for label, text in (
+        ("single message", SCAMMER_TURNS[1]),
+        ("10-turn conversation", build_conversation(10)),
+        ("60-turn conversation", build_conversation(60)),
+    ):
+        text = clean_scammer_text(text)
+        legacy = _extract(text, None)
+        scanned = _extract(text, _scan_triggers(text))
+        if legacy != scanned:
+            raise SystemExit(f"MISMATCH on {label}:\n{legacy}\n{scanned}")
+
+        legacy_ms = timed(lambda: _extract(text, None), repeats)
+        scan_ms = timed(lambda: _extract(text, _scan_triggers(text)), repeats)
+        print(
+            f"{label:<22} {len(text):>6} chars  "
+            f"full regex {legacy_ms:7.2f} ms  scanner {scan_ms:7.2f} ms  "
+            f"({legacy_ms / scan_ms:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()